@@ -0,0 +1,49 @@
+"""Benchmark comparing the automaton evolution backends.
+
+Run with `python benchmarks/backends.py` with ndautomata installed.
+"""
+from timeit import timeit
+
+from ndautomata import BaseAutomaton, TotalisticAutomaton, backends
+from ndautomata import initializers, neighbours
+
+CASES = [  # (base, ndim, radius, states, shape)
+    (BaseAutomaton, 1, 1, 2, [1_000_000]),
+    (BaseAutomaton, 1, 3, 2, [1_000_000]),
+    (BaseAutomaton, 2, 1, 2, [1000, 1000]),
+    (TotalisticAutomaton, 2, 2, 2, [1000, 1000]),
+    (TotalisticAutomaton, 3, 1, 2, [100, 100, 100]),
+    (TotalisticAutomaton, 3, 2, 3, [100, 100, 100]),
+]
+
+
+def automaton(base, ndim, radius, nstates, shape, backend):
+    class Automaton(base):
+        neighbours = neighbours.regular(ndim, radius)
+        states = nstates
+
+    if base is TotalisticAutomaton:
+        size = [nstates, Automaton.max_sum + 1]
+    else:
+        size = [nstates] * Automaton.neighbours.size
+    rule = initializers.random(states=nstates, size=size)
+    ic = initializers.random(states=nstates, size=shape)
+    return Automaton(ic, rule, backend=backend)
+
+
+if __name__ == "__main__":
+    steps, number = 10, 3
+    header = f"{'automaton':>20} {'ndim':>4} {'r':>2} {'states':>6}"
+    print(header + "".join(f"{name:>10}" for name in backends.BACKENDS))
+    for base, ndim, radius, nstates, shape in CASES:
+        timings = []
+        for backend in backends.BACKENDS:
+            if not backends.available(backend):
+                timings.append(float("nan"))
+                continue
+            ca = automaton(base, ndim, radius, nstates, shape, backend)
+            ca.evolve(1)  # Warm up, compiles numba kernels
+            time = timeit(lambda: ca.evolve(steps), number=number)
+            timings.append(time / (steps * number))
+        row = f"{base.__name__:>20} {ndim:>4} {radius:>2} {nstates:>6}"
+        print(row + "".join(f"{time:>10.4f}" for time in timings))
@@ -0,0 +1,213 @@
+"""Benchmark suite for the automaton engines and neighbourhoods.
+
+Each case builds an automaton from a kernel, number of states, grid
+size, initializer and engine, and measures the construction time, the
+time per generation (and cells per second) and the peak memory
+allocated while constructing and evolving it.
+
+Run with ndautomata installed, store the results as the baseline and
+compare later runs against it to find regressions:
+
+    python benchmarks/suite.py run --output benchmarks/baseline.json
+    python benchmarks/suite.py run --output current.json
+    python benchmarks/suite.py compare benchmarks/baseline.json current.json
+"""
+import argparse
+import itertools
+import json
+import platform
+import sys
+import tracemalloc
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+
+from ndautomata import BaseAutomaton, TotalisticAutomaton, backends
+from ndautomata import initializers, neighbours
+from ndautomata.bitpacked import BitPackedAutomaton
+from ndautomata.sparse import SparseAutomaton
+
+KERNELS = {
+    "regular-1d-r1": lambda: neighbours.regular(ndim=1, r=1),
+    "regular-1d-r3": lambda: neighbours.regular(ndim=1, r=3),
+    "regular-2d-r1": lambda: neighbours.regular(ndim=2, r=1),
+    "hexagonal-2d-r1": lambda: neighbours.hexagonal(ndim=2, r=1),
+    "orthogonal-1x5": lambda: neighbours.orthogonal([1, 5]),
+    "regular-3d-r1": lambda: neighbours.regular(ndim=3, r=1),
+}
+STATES = [2, 3]
+SIZES = {  # Shapes with the same number of cells for each dimension
+    "small": {1: [4096], 2: [64, 64], 3: [16, 16, 16]},
+    "large": {1: [2**20], 2: [1024, 1024], 3: [128, 128, 64]},
+}
+INITIALIZERS = ["random", "center"]
+ENGINES = {
+    "scipy": BaseAutomaton,
+    "numba": BaseAutomaton,
+    "totalistic": TotalisticAutomaton,
+    "sparse": SparseAutomaton,
+    "bitpacked": BitPackedAutomaton,
+}
+MAX_RULE = 2**27  # Largest rule table entries, 128 MiB of uint8
+MAX_PROGRAM = 2**20  # Largest rule compiled into bitwise operations
+
+
+def cases(kernels=KERNELS, states=STATES, sizes=SIZES,
+          inits=INITIALIZERS, engines=ENGINES):
+    """Yields the names and parameters of the supported benchmark cases.
+    :return: Generator of (name, (kernel, states, size, init, engine))
+    """
+    grid = itertools.product(kernels, states, sizes, inits, engines)
+    for case in grid:
+        if supported(*case):
+            yield "/".join(str(x) for x in case), case
+
+
+def supported(kernel, nstates, size, init, engine):
+    array = KERNELS[kernel]()
+    shape = SIZES[size][array.ndim]
+    if engine == "numba" and not backends.available("numba"):
+        return False
+    if engine == "bitpacked":
+        values = array[array != 0]
+        unique = np.unique(values).size == values.size
+        fits = 2**array.size <= MAX_PROGRAM and shape[-1] % 64 == 0
+        return nstates == 2 and unique and fits
+    return engine == "totalistic" or nstates**array.size <= MAX_RULE
+
+
+@lru_cache(maxsize=None)
+def automaton_class(kernel, nstates, engine):
+    class Automaton(ENGINES[engine]):
+        neighbours = KERNELS[kernel]()
+        states = nstates
+
+    if engine == "numba":
+        Automaton.backend = "numba"
+    return Automaton
+
+
+@lru_cache(maxsize=2)  # Large rules are reused by consecutive cases
+def rule(kernel, nstates, totalistic):
+    cls = automaton_class(kernel, nstates, "totalistic")
+    if totalistic:
+        size = [nstates, cls.max_sum + 1]
+    else:
+        size = [nstates] * cls.neighbours.size
+    return initializers.random(states=nstates, size=size)
+
+
+def measure(kernel, nstates, size, init, engine, repeat=5, time=0.2):
+    """Measures a benchmark case.
+    :param repeat: Number of repetitions, the minimum time is reported
+    :param time: Minimum seconds for each repetition of the steps
+    :return: Dictionary with the case results
+    """
+    cls = automaton_class(kernel, nstates, engine)
+    shape = SIZES[size][cls.neighbours.ndim]
+    table = rule(kernel, nstates, engine == "totalistic")
+    ic = getattr(initializers, init)(nstates, shape)
+    construct = min(_timed(cls, ic, table)[1] for _ in range(repeat))
+    ca = cls(ic, table)
+    ca.evolve(1)  # Warm up, compiles numba kernels and allocates buffers
+    steps, elapsed = 1, _timed(ca.evolve, 1)[1]
+    while elapsed < time:  # Find the steps for a measurable repetition
+        steps *= 2
+        elapsed = _timed(ca.evolve, steps)[1]
+    step = min(_timed(ca.evolve, steps)[1] for _ in range(repeat)) / steps
+    tracemalloc.start()
+    cls(ic, table).evolve(2)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    cells = int(np.prod(shape))
+    return dict(construct=construct, step=step, throughput=cells / step,
+                peak=peak, cells=cells)
+
+
+def run(args):
+    results = {}
+    for name, case in cases():
+        if args.select and not any(x in name for x in args.select):
+            continue
+        results[name] = measure(*case, repeat=args.repeat)
+        print(_row(name, results[name]), flush=True)
+    report = dict(meta=_meta(), results=results)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=1, sort_keys=True)
+
+
+def compare(args):
+    with open(args.baseline) as file:
+        baseline = json.load(file)["results"]
+    with open(args.current) as file:
+        current = json.load(file)["results"]
+    regressions = 0
+    print(f"{'case':<48}{'step':>9}{'construct':>11}{'peak':>9}")
+    for name in sorted(baseline.keys() & current.keys()):
+        ratios = [current[name][x] / baseline[name][x] if baseline[name][x]
+                  else 1.0 for x in ("step", "construct", "peak")]
+        slower = [x > 1 + args.threshold for x in ratios]
+        regressions += any(slower)
+        cells = [f"{x:.2f}" + ("!" if y else " ") for x, y in
+                 zip(ratios, slower)]
+        print(f"{name:<48}{cells[0]:>9}{cells[1]:>11}{cells[2]:>9}")
+    missing = len(baseline.keys() - current.keys())
+    print(f"{missing} baseline cases missing in current results")
+    print(f"{regressions} regressions above {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def _timed(function, *args):
+    start = perf_counter()
+    result = function(*args)
+    return result, perf_counter() - start
+
+
+def _row(name, result):
+    return (f"{name:<48}{result['step'] * 1e3:>10.3f} ms/step"
+            f"{result['throughput']:>12.3g} cells/s"
+            f"{result['construct'] * 1e3:>10.3f} ms init"
+            f"{result['peak'] / 2**20:>9.2f} MiB")
+
+
+def _meta():
+    import ndautomata
+
+    version = Path(ndautomata.__file__).with_name("VERSION").read_text()
+    versions = dict(numpy=np.__version__, python=platform.python_version())
+    if backends.available("numba"):
+        import numba
+
+        versions.update(numba=numba.__version__)
+    return dict(
+        date=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        machine=platform.machine(),
+        platform=platform.platform(),
+        ndautomata=version.strip(),
+        versions=versions,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    parser_run = commands.add_parser("run", help="run the benchmarks")
+    parser_run.add_argument("-o", "--output", help="results JSON file")
+    parser_run.add_argument("-k", "--select", action="append",
+                            help="run only cases containing this text")
+    parser_run.add_argument("--repeat", type=int, default=5)
+    parser_cmp = commands.add_parser("compare", help="compare two results")
+    parser_cmp.add_argument("baseline", help="baseline results JSON file")
+    parser_cmp.add_argument("current", help="current results JSON file")
+    parser_cmp.add_argument("--threshold", type=float, default=0.1,
+                            help="relative slowdown reported, default 0.1")
+    args = parser.parse_args(argv)
+    return (run if args.command == "run" else compare)(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,14 +10,14 @@ of the current state of the cell and the states of the cells in its
 neighborhood.
 """
 import copy
+import warnings
+import weakref
 from abc import ABC
-from math import ceil, floor
 
 import numpy as np
 from pydantic import PositiveInt
-from scipy.ndimage import correlate
-
-from ndautomata import neighbours
+from ndautomata import backends, boundaries, indexing, neighbours
+from ndautomata import parallel, rules
 
 
 class BaseAutomaton(ABC):
@@ -35,6 +35,16 @@ class BaseAutomaton(ABC):
         Rule dimensions mut match the neighbours size.
         Dimension length must be equal or lower than the number of states.
         `Rule.shape ~= [Automaton.states] * Automaton.neighbours.size`
+    backend : str, optional
+        Kernel used to evolve the automaton, see `backends.BACKENDS`.
+        Defaults to the class attribute `backend`.
+    workers : PositiveInt, optional
+        Number of threads evolving tiles of the configuration.
+        Defaults to the class attribute `workers`.
+    trusted : bool, optional
+        If True, the configuration and rule states are not validated and
+        the configuration buffer is adopted instead of copied, it stays
+        the live configuration as `evolve` writes back into it.
 
     Attributes
     ----------
@@ -46,13 +56,23 @@ class BaseAutomaton(ABC):
         Number of dimensions the rule requires.
     rule : (N,) ndarray
         Rule used to calculate next cell states in the cellular automaton.
+    generation : int
+        Number of generations evolved since the initial configuration.
 
     Methods
     ----------
+    weights(cls) : ndarray
+        Returns the correlation kernel used to index the rule table.
     neighbour_indexes(self) : ndarray
         Calculates and returns the index values for each cell neighbours.
-    cell_neighbours : (N,) ndarray
+    evolve(self, steps, out=None, stride=1) : ndarray
+        Advances multiple generations writing them into a buffer.
+    reset(self, configuration, trusted=False) : None
+        Restarts the automaton from a configuration reusing its buffers.
+    cell_neighbours(self, *index) : (N,) ndarray
         Returns the values of the cell position neighbours as 1-dim array.
+    cells_neighbours(self, indices) : (M, N) ndarray
+        Returns the neighbours values of many cell positions at once.
 
     Class Attributes
     ----------------
@@ -60,35 +80,233 @@ class BaseAutomaton(ABC):
         Relative indexing for each cell in the cellular automaton.
     states : PositiveInt
         Amount of possible states a cell can take.
+    backend : str
+        Default kernel used to evolve the automaton, "scipy" or "numba".
+    workers : PositiveInt
+        Default number of threads used to evolve the automaton.
+    compact : bool
+        If True, rules are stored compiled with `rules.compile`, rule
+        entries unreachable from the neighbours are read as 0.
+    boundary : str
+        How cells outside the configuration are read, one of "wrap"
+        (default), "constant", "reflect" or "open", see `boundaries`.
+    cval : int
+        State of the cells outside for the "constant" boundary.
+    indexing : str
+        How rule indexes are computed, one of "dense", "shifted",
+        "separable" or "auto" (default), see `indexing`.
+
+    Notes
+    -----
+    Weights are computed once per class and read-only rules are
+    validated once per class, so creating many automata that share a
+    class and a read-only rule (`rule.setflags(write=False)`) only
+    checks the configuration.
     """
 
     neighbours: np.ndarray
     states: PositiveInt
+    backend: str = "scipy"
+    workers: PositiveInt = 1
+    compact: bool = False
+    boundary: str = "wrap"
+    cval: int = 0
+    indexing: str = "auto"
+    _mode: str = "clip"  # Rule indexes are always lower than rule size
+    _trusted: bool = False  # Skip states validation
 
-    def __init__(self, initial_configuration, rule):
-        if initial_configuration.ndim != self.dimensions:
+    def __init__(
+        self,
+        initial_configuration,
+        rule,
+        backend=None,
+        workers=None,
+        trusted=False,
+    ):
+        if self.boundary not in boundaries.MODES:
+            raise ValueError(f"Unknown boundary {self.boundary}")
+        if self.indexing not in (*indexing.STRATEGIES, "auto"):
+            raise ValueError(f"Unknown indexing {self.indexing}")
+        if not 0 <= self.cval < self.states:
+            raise ValueError("Boundary cval is not a valid state")
+        self._trusted = trusted
+        self._check_configuration(initial_configuration)
+        if trusted:  # Adopt the caller buffer
+            self.configuration = initial_configuration
+        else:
+            self.configuration = copy.copy(initial_configuration)
+        self._adopted = initial_configuration if trusted else None
+        self.generation = 0
+        self._weights = self._kernel()
+        self.rule = rule
+        self._trusted = False
+        self._dtype = self._index_dtype()
+        self.__index = np.empty(initial_configuration.shape, self._dtype)
+        self.__spare = None
+        self._indexer = None  # Built for the current weights
+        self.backend = backend or self.backend
+        if not backends.available(self.backend):
+            warnings.warn(f"Backend {self.backend} not available, using scipy")
+            self.backend = "scipy"
+        if self.backend == "numba":
+            self._stencil = backends.stencil(self._weights)
+        self.workers = workers or self.workers
+        self._tiles = {}  # Index buffers and indexers for each tile
+
+    @classmethod
+    def weights(cls):
+        """Returns the correlation kernel that maps the states of a cell
+        neighbourhood into the flat index of the rule table.
+        :return: Numpy array with the shape of the neighbours
+        """
+        neighbourhood = neighbours.Neighbourhood(cls.neighbours)
+        return neighbourhood.weights(cls.states)  # Shared and read-only
+
+    @classmethod
+    def _kernel(cls):
+        neighbours, states, weights = _kernels.get(cls, (None, None, None))
+        if neighbours is not cls.neighbours or states != cls.states:
+            weights = cls.weights()
+            weights.setflags(write=False)  # Shared by all the instances
+            _kernels[cls] = cls.neighbours, cls.states, weights
+        return weights
+
+    def _check_configuration(self, configuration):
+        if configuration.ndim != self.dimensions:
             raise ValueError("Initial configuration does not fit dimensions")
-        if np.max(initial_configuration) >= self.states:
+        if not self._trusted and np.max(configuration) >= self.states:
             raise ValueError("Initial configuration contains invalid states")
-        self.configuration = copy.copy(initial_configuration)
-        self.rule = rule
-        self.__index = np.empty(initial_configuration.shape, dtype="uint")
-        self._weights = np.array(self.states**self.neighbours, dtype="uint")
-        self._weights //= self.states
+
+    def _check_states(self, rule):
+        if self._trusted or _validated(type(self), rule):
+            return
+        if np.max(rule) >= self.states:
+            raise ValueError("Rule contains invalid state values")
+        if _frozen(rule):  # Only rules that cannot change
+            _remember(type(self), rule)
+
+    def reset(self, configuration, trusted=False):
+        """Restarts the automaton from a configuration copying it into the
+        current configuration buffer, no memory is allocated.
+        :param configuration: New configuration with the current shape
+        :param trusted: If True, the configuration states are not checked
+        """
+        if configuration.shape != self.configuration.shape:
+            raise ValueError("Configuration does not fit automaton shape")
+        self._trusted = trusted
+        self._check_configuration(configuration)
+        self._trusted = False
+        self._load(configuration)
+        self.generation = 0
+
+    def _load(self, configuration):
+        np.copyto(self.configuration, configuration)
 
     def neighbour_indexes(self):
-        correlate(
-            self.configuration,  # Automaton states and neighbours
-            self._weights,  # Correlation with connection weights
-            mode="wrap",  # ‘wrap’ (a b c d | a b c d | a b c d)
-            output=self.__index,  # Output should be uint max
-        )
-        return self.__index
+        return self._indexes(self.configuration)
+
+    def _indexes(self, configuration, indexer=None, out=None):
+        if indexer is not None:  # Tiles have their own indexer and buffer
+            return indexer(configuration, out)
+        if self._indexer is None or self._indexer.weights is not self._weights:
+            self._indexer = self._make_indexer()
+        return self._indexer(configuration, self.__index)
+
+    def _make_indexer(self):
+        kernel = self._weights, self.boundary, self.cval, self.indexing
+        return indexing.Indexer(*kernel)
+
+    def _transition(self, source, target):
+        if self.workers > 1:
+            return self._tiled_transition(source, target)
+        if self._fused(source, target):
+            stencil = *self._stencil, self._rule
+            return backends.transition(source, target, *stencil)
+        indexes = self._indexes(source)  # Calculate neighbour indexes
+        return self._gather(indexes, target)
+
+    def _fused(self, source, target):
+        if self.backend != "numba" or self.boundary != "wrap":
+            return False  # The numba kernel is toroidal
+        if self._mode != "clip":
+            return False  # The numba kernel does not check rule bounds
+        return _contiguous(source, target)
+
+    def _gather(self, indexes, target, rows=slice(None)):
+        if target.dtype != self._rule.dtype:  # numpy.take out needs it
+            target[...] = np.take(self._rule, indexes, mode=self._mode)
+            return target
+        return np.take(self._rule, indexes, out=target, mode=self._mode)
+
+    def _index_dtype(self):
+        return rules.index_dtype(self._weights, self.states)
+
+    def _tiled_transition(self, source, target):
+        pool = parallel.executor(self.workers)
+        tiles = parallel.tiles(source.shape[0], self.workers)
+        jobs = [pool.submit(self._tile, source, target, *x) for x in tiles]
+        for job in jobs:
+            job.result()  # Wait for all tiles and raise their errors
+        return target
+
+    def _tile(self, source, target, start, stop):
+        if self._fused(source, target):
+            rows = source.size // source.shape[0]  # Cells per first axis
+            cells = start * rows, stop * rows
+            stencil = *self._stencil, self._rule, cells
+            return backends.transition(source, target, *stencil)
+        before = self._weights.shape[0] // 2  # Halo sizes from the kernel
+        after = self._weights.shape[0] - before - 1
+        halo = before, after, self.boundary, self.cval
+        array = parallel.halo(source, start, stop, *halo)
+        if (start, stop) not in self._tiles:
+            buffer = np.empty(array.shape, self._dtype)
+            self._tiles[start, stop] = buffer, self._make_indexer()
+        indexes, indexer = self._tiles[start, stop]
+        indexes = self._indexes(array, indexer, indexes)
+        indexes = indexes[before:][: stop - start]
+        self._gather(indexes, target[start:stop], slice(start, stop))
 
     def __next__(self):
-        self.neighbour_indexes()  # Calculate neighbour indexes
-        self.configuration[:] = self._rule[self.__index]
-        return copy.deepcopy(self.configuration)
+        self.evolve(1)
+        return self._copy(self.configuration)
+
+    def _copy(self, configuration):
+        return copy.deepcopy(configuration)
+
+    def evolve(self, steps, out=None, stride=1):
+        """Advances the automaton `steps * stride` generations writing one
+        every `stride` generations into `out` without intermediate copies.
+        Configurations are double buffered internally, so when `out` is
+        None the generations are discarded and only the last one is kept.
+        :param steps: Number of generations to record into `out`
+        :param out: Optional (steps, *shape) ndarray to write generations
+        :param stride: Generations to advance between each record
+        :return: `out` or a view of the final configuration if not given
+        """
+        if steps < 0 or stride < 1:
+            raise ValueError("Expected steps >= 0 and stride >= 1")
+        shape = (steps, *self.configuration.shape)
+        if out is not None and out.shape != shape:
+            raise ValueError(f"Output shape does not fit {shape}")
+        if self.__spare is None:
+            self.__spare = np.empty_like(self.configuration)
+        front, back = self.configuration, self.__spare
+        current = self.configuration
+        for step in range(steps):
+            for generation in range(1, stride + 1):
+                if out is not None and generation == stride:
+                    target = out[step]  # Write directly into the record
+                else:  # Use the buffer not holding current configuration
+                    target = back if current is front else front
+                current = self._transition(current, target)
+        self.generation += steps * stride
+        adopted = self._adopted is not None  # Keep the caller buffer
+        if current is self.__spare and not adopted:  # Swap, do not copy
+            self.configuration, self.__spare = self.__spare, self.configuration
+        elif current is not self.configuration:
+            self.configuration[...] = current
+        return self.configuration if out is None else out
 
     @classmethod
     @property
@@ -100,9 +318,16 @@ class BaseAutomaton(ABC):
     def rule_constrain(cls):
         return cls.neighbours.size
 
+    @classmethod
+    @property
+    def index_dtype(cls):
+        return rules.index_dtype(cls.weights(), cls.states)
+
     @property
     def rule(self):
         rule_shape = [self.states] * self.rule_constrain
+        if self.compact:
+            return self._compiled.expand().reshape(rule_shape)
         return self._rule.reshape(rule_shape)
 
     @rule.setter
@@ -111,34 +336,141 @@ class BaseAutomaton(ABC):
             raise TypeError("Expected ndarray for rule value")
         if len(value.shape) != self.rule_constrain:
             raise ValueError("Rule shape does not fit neighbours size")
-        if np.max(value) >= self.states:
-            raise ValueError("Rule contains invalid state values")
-        self._rule = value.ravel()
+        self._check_states(value)
+        if self.compact:  # Store only reachable rule entries
+            compiled = rules.compile(self.neighbours, self.states, value)
+            self._rule, self._weights = compiled.table, compiled.weights
+            self._compiled = compiled
+        else:
+            self._rule = value.ravel()
+            max_index = int(self._weights.sum(dtype=object))
+            max_index *= self.states - 1  # Rules smaller than the indexes
+            self._mode = "clip" if max_index < self._rule.size else "raise"
 
     def cell_neighbours(self, *index):
-        shape = self.neighbours.shape
-        pads = [(floor(dim / 2), ceil(dim / 2)) for dim in shape]
-        array = np.pad(self.configuration, pads, "wrap")
-        views = np.lib.stride_tricks.sliding_window_view
-        return views(array, shape)[tuple(index)].ravel()[::-1]
+        halo = neighbours.Neighbourhood(self.neighbours).halo
+        rows = [np.arange(x - a, x + b + 1) for x, (a, b) in zip(index, halo)]
+        array = self.configuration
+        block = boundaries.take(array, rows, self.boundary, self.cval)
+        return block.ravel()[::-1]
+
+    def cells_neighbours(self, indices):
+        """Returns the neighbours values of many cells, reading only the
+        cells in their neighbourhoods.
+        :param indices: (M, ndim) integer array of cell positions, for
+            example the result of `numpy.argwhere`
+        :return: (M, neighbours.size) array, each row as `cell_neighbours`
+        """
+        indices = np.asarray(indices).reshape(-1, self.dimensions)
+        neighbourhood = neighbours.Neighbourhood(self.neighbours)
+        shape, array = neighbourhood.shape, self.configuration
+        offsets = np.indices(shape).reshape(len(shape), -1)
+        offsets -= np.array(neighbourhood.centre)[:, None]
+        cells, outside = [], np.zeros(1, dtype=bool)
+        for axis, length in enumerate(array.shape):
+            rows = indices[:, axis, None] + offsets[axis]
+            rows, mask = boundaries.fold(rows, length, self.boundary)
+            cells.append(rows)
+            outside = outside if mask is None else outside | mask
+        values = array[tuple(cells)]
+        values[np.broadcast_to(outside, values.shape)] = self.cval
+        return values[:, ::-1]
+
+
+_kernels = weakref.WeakKeyDictionary()  # Weights of each class
+_rules = weakref.WeakKeyDictionary()  # Rules validated for each class
+
+
+def _validated(cls, rule):
+    reference = _rules.get(cls, {}).get(id(rule))
+    if reference is None or reference() is not rule:
+        return False  # Not validated, or the id of a freed rule
+    return _frozen(rule)  # Writable again, it must be validated again
+
+
+def _remember(cls, rule):
+    rules, key = _rules.setdefault(cls, {}), id(rule)
+
+    def forget(reference):  # The id may already hold a newer rule
+        if rules.get(key) is reference:
+            del rules[key]
 
+    rules[key] = weakref.ref(rule, forget)
 
-if __name__ == "__main__":
-    from timeit import timeit
 
-    from ndautomata import initializers
+def _frozen(rule):
+    array = rule  # Neither the rule nor the arrays it views are writable
+    while isinstance(array, np.ndarray):
+        if array.flags.writeable:
+            return False
+        array = array.base
+    return True
 
-    class Automaton(BaseAutomaton):
-        dimensions = 3
-        neighbours = neighbours.regular(ndim=3, r=1)
-        states = 2
 
-    # Configuration
-    connections = [Automaton.states] * Automaton.neighbours.size
-    rule = initializers.random(states=Automaton.states, size=connections)
-    ic = initializers.random(states=Automaton.states, size=[100, 100, 10])
-    ca = Automaton(ic, rule)
+def _contiguous(*arrays):
+    return all(array.flags.c_contiguous for array in arrays)
 
-    # Profiling
-    time = timeit(lambda: [next(ca) for _ in range(100)], number=10)
-    print(f"cc next timing: {time}")
+
+class TotalisticAutomaton(BaseAutomaton):
+    """Abstract class for outer-totalistic automaton generation. The next
+    state of a cell depends only on its own state and on the sum of the
+    states of its neighbours, so the rule table grows with the range of
+    the sum instead of with `states**neighbours.size`.
+
+    Non zero `neighbours` positions are considered neighbours, the center
+    of the kernel (`shape // 2`) is the cell itself and is not included
+    in the sum. Pure totalistic rules can be defined with a rule where
+    `rule[c, s] == f(c + s)`.
+
+    Parameters
+    ----------
+    initial_configuration : (N,) ndarray
+        Initial configuration for all the automaton cells.
+        Cell values must be lower than the number of states.
+    rule :  (states, max_sum + 1) ndarray
+        Next cell value indexed by the cell state and neighbours sum.
+        `Rule.shape == (Automaton.states, Automaton.max_sum + 1)`
+
+    Class Attributes
+    ----------------
+    neighbours :  (N,) ndarray
+        Kernel where non zero positions are the cell neighbours.
+    states : PositiveInt
+        Amount of possible states a cell can take.
+    """
+
+    @classmethod
+    def weights(cls):
+        weights = np.array(cls.neighbours != 0, dtype="uint")
+        weights[cls.center] = cls.max_sum + 1
+        return weights
+
+    @classmethod
+    @property
+    def center(cls):
+        return tuple(dim // 2 for dim in cls.neighbours.shape)
+
+    @classmethod
+    @property
+    def max_sum(cls):
+        connections = np.count_nonzero(cls.neighbours)
+        connections -= cls.neighbours[cls.center] != 0
+        return int(connections) * (cls.states - 1)
+
+    @classmethod
+    @property
+    def rule_constrain(cls):
+        return 2
+
+    @property
+    def rule(self):
+        return self._rule.reshape(self.states, self.max_sum + 1)
+
+    @rule.setter
+    def rule(self, value):
+        if not isinstance(value, np.ndarray):
+            raise TypeError("Expected ndarray for rule value")
+        if value.shape != (self.states, self.max_sum + 1):
+            raise ValueError("Rule shape does not fit (states, max_sum + 1)")
+        self._check_states(value)
+        self._rule = value.ravel()
@@ -0,0 +1,92 @@
+"""Module with compiled stencil kernels for automaton evolution.
+
+The default backend ("scipy") calculates the neighbour indexes with
+`scipy.ndimage.correlate` and gathers the next states from the rule in
+a second pass. The "numba" backend fuses both operations into a single
+pass over the configuration and is only available when numba is
+installed, otherwise automata fall back to the "scipy" backend.
+"""
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # pragma: no cover
+    numba = None
+
+BACKENDS = ("scipy", "numba")
+
+
+def available(backend):
+    """Returns True if the backend can be used in the current environment.
+    :param backend: Name of the backend, one of `BACKENDS`
+    :return: Boolean
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend}, expected {BACKENDS}")
+    return backend != "numba" or numba is not None
+
+
+def stencil(weights):
+    """Returns the offsets and weights of the non zero kernel positions
+    with the same alignment `scipy.ndimage.correlate` uses.
+    :param weights: Correlation kernel with the rule index weights
+    :return: Tuple with (K, ndim) offsets and (K,) weights arrays
+    """
+    positions = np.argwhere(weights != 0)
+    center = np.array([dim // 2 for dim in weights.shape])
+    offsets = (positions - center).reshape(-1, weights.ndim)
+    return offsets, weights[tuple(positions.T)].astype("int64")
+
+
+def transition(source, target, offsets, weights, rule, cells=None):
+    """Calculates the next generation of `source` into `target` with the
+    fused numba kernel using toroidal ("wrap") boundaries.
+    :param source: C-contiguous configuration array
+    :param target: C-contiguous output array, must not be `source`
+    :param offsets: (K, ndim) relative neighbour positions
+    :param weights: (K,) rule index weight of each neighbour position
+    :param rule: Flat rule table
+    :param cells: Optional (first, last) range of flat cells to calculate
+    :return: Target array
+    """
+    shape = np.array(source.shape, dtype="int64")
+    offsets = np.mod(offsets, shape)  # Positive offsets lower than shape
+    first, last = cells if cells is not None else (0, source.size)
+    flat_source, flat_target = source.reshape(-1), target.reshape(-1)
+    stencil = shape, offsets, weights, rule, first, last
+    _kernel(flat_source, flat_target, *stencil)
+    return target
+
+
+def _fused(source, target, shape, offsets, weights, rule, first, last):
+    ndim, width = shape.size, shape[-1]
+    coords = np.zeros(ndim, dtype=np.int64)
+    indexes = np.empty(width, dtype=np.int64)  # Single row index buffer
+    for row in range(first // width, (last - 1) // width + 1):
+        low = max(first - row * width, 0)  # Range of cells in the row
+        high = min(last - row * width, width)
+        remainder = row  # Coordinates of the row in the leading axes
+        for axis in range(ndim - 2, -1, -1):
+            coords[axis] = remainder % shape[axis]
+            remainder //= shape[axis]
+        indexes[low:high] = 0
+        for k in range(weights.size):
+            base = 0  # Wrapped row of the neighbour in the leading axes
+            for axis in range(ndim - 1):
+                coord = coords[axis] + offsets[k, axis]
+                if coord >= shape[axis]:
+                    coord -= shape[axis]
+                base = base * shape[axis] + coord
+            base, split = base * width, width - offsets[k, ndim - 1]
+            for i in range(low, min(split, high)):  # Contiguous part
+                indexes[i] += weights[k] * source[base + i + width - split]
+            for i in range(max(split, low), high):  # Wrapped part
+                indexes[i] += weights[k] * source[base + i - split]
+        for i in range(low, high):
+            target[row * width + i] = rule[indexes[i]]
+
+
+if numba is not None:
+    _kernel = numba.njit(nogil=True, cache=True)(_fused)
+else:  # pragma: no cover
+    _kernel = _fused
@@ -0,0 +1,93 @@
+"""Module with the boundary conditions of automata.
+
+Cells outside the configuration are read according to the boundary:
+
+- "wrap": toroidal, (a b c d | a b c d | a b c d).
+- "constant": fixed value `cval`, (k k k k | a b c d | k k k k).
+  With `cval=0` it is an absorbing boundary.
+- "reflect": mirrored at the edge, (d c b a | a b c d | d c b a).
+- "open": edge cells repeat outwards (zero flux),
+  (a a a a | a b c d | d d d d).
+"""
+import numpy as np
+
+MODES = {  # Boundary name to scipy.ndimage mode
+    "wrap": "wrap",
+    "constant": "constant",
+    "reflect": "reflect",
+    "open": "nearest",
+}
+
+
+def fold(indexes, length, boundary):
+    """Maps indexes along an axis into the configuration following a
+    boundary, so only the needed cells are read without padding copies.
+    :param indexes: Integer array of indexes, may be out of the axis
+    :param length: Length of the axis
+    :param boundary: Boundary name, one of `MODES`
+    :return: Tuple with the indexes inside `[0, length)` and a boolean
+        mask of indexes that read `cval`, None if there are none
+    """
+    indexes = np.asarray(indexes)
+    if boundary == "wrap":
+        return indexes % length, None
+    if boundary == "reflect":
+        indexes = indexes % (2 * length)  # Period of two mirrored copies
+        mirrored = 2 * length - 1 - indexes
+        return np.where(indexes < length, indexes, mirrored), None
+    inside = np.clip(indexes, 0, length - 1)
+    if boundary == "open":
+        return inside, None
+    if boundary == "constant":
+        return inside, (indexes < 0) | (indexes >= length)
+    raise ValueError(f"Unknown boundary {boundary}, expected one of {MODES}")
+
+
+def take(array, rows, boundary, cval=0):
+    """Returns the block of `array` at the outer product of the rows of
+    each axis, reading cells outside the array following a boundary.
+    :param array: Configuration array
+    :param rows: List with an integer array of indexes for each axis
+    :param boundary: Boundary name, one of `MODES`
+    :param cval: Value of the cells outside for "constant" boundaries
+    :return: Numpy array with shape `[len(x) for x in rows]`
+    """
+    folded = [fold(x, n, boundary) for x, n in zip(rows, array.shape)]
+    block = array[np.ix_(*[x for x, _ in folded])]
+    outside = [x for _, x in folded]
+    if any(x is not None and x.any() for x in outside):
+        mask = np.zeros(block.shape, dtype=bool)
+        for axis, x in enumerate(outside):
+            shape = [1] * block.ndim
+            shape[axis] = -1
+            mask |= x.reshape(shape)
+        block[mask] = cval
+    return block
+
+
+def pad(array, halo, boundary, cval=0, out=None):
+    """Returns the array surrounded by the cells outside it following a
+    boundary, as `numpy.pad`, writing into a reusable buffer.
+    :param array: Configuration array
+    :param halo: (before, after) number of cells for each axis
+    :param boundary: Boundary name, one of `MODES`
+    :param cval: Value of the cells outside for "constant" boundaries
+    :param out: Optional array with the padded shape to write into
+    :return: `out` or a new array with the padded shape
+    """
+    shape = [n + a + b for n, (a, b) in zip(array.shape, halo)]
+    if out is None:
+        out = np.empty(shape, dtype=array.dtype)
+    inner = tuple(slice(a, a + n) for n, (a, _) in zip(array.shape, halo))
+    out[inner] = array
+    for axis, (length, (before, after)) in enumerate(zip(array.shape, halo)):
+        edges = np.arange(-before, 0), np.arange(length, length + after)
+        for start, rows in zip([0, before + length], edges):
+            rows, outside = fold(rows, length, boundary)
+            region = [slice(None)] * out.ndim
+            region[axis] = slice(start, start + len(rows))
+            out[tuple(region)] = np.take(out, before + rows, axis)
+            if outside is not None:
+                region[axis] = start + np.flatnonzero(outside)
+                out[tuple(region)] = cval
+    return out
@@ -0,0 +1,96 @@
+"""Module with tools to checkpoint and restore automata.
+
+A checkpoint is a directory with a `snapshot.json` header and the
+configuration in `configuration.npy`. Rule tables are kept apart in a
+content addressed store, `rules/<sha256>.npy`, shared by all the
+checkpoints in the same parent directory, so identical rules are written
+only once and can be loaded as read-only memory maps without copies.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+FORMAT, VERSION = "ndautomata.checkpoint", 1
+
+
+def rule_digest(rule):
+    """Returns the SHA-256 hex digest of a rule table dtype, shape and
+    values, equal rules have the same digest.
+    :param rule: Rule table array
+    :return: String with 64 hexadecimal characters
+    """
+    rule = np.ascontiguousarray(rule)
+    hasher = hashlib.sha256(f"{rule.dtype.str}{rule.shape}".encode())
+    hasher.update(memoryview(rule).cast("B"))
+    return hasher.hexdigest()
+
+
+def save(automaton, path, store=None):
+    """Writes a checkpoint of the automaton configuration, rule and
+    generation. Files are written to temporary names and renamed, the
+    header last, so an interrupted save never leaves a corrupt checkpoint.
+    :param automaton: Automaton instance to checkpoint
+    :param path: Directory where to write the checkpoint
+    :param store: Rules store directory, defaults to `path/../rules`
+    :return: Path of the checkpoint directory
+    """
+    path = Path(path)
+    store = Path(store) if store is not None else path.parent / "rules"
+    path.mkdir(parents=True, exist_ok=True)
+    store.mkdir(parents=True, exist_ok=True)
+    rule = automaton.rule
+    digest = rule_digest(rule)
+    if not (store / f"{digest}.npy").exists():  # Deduplicate rules
+        _atomic(store / f"{digest}.npy", lambda x: np.save(x, rule))
+    configuration = automaton.configuration
+    _atomic(path / "configuration.npy", lambda x: np.save(x, configuration))
+    header = dict(format=FORMAT, version=VERSION)
+    header.update(automaton=type(automaton).__qualname__)
+    header.update(neighbours=np.asarray(automaton.neighbours).tolist())
+    header.update(states=int(automaton.states), rule=digest)
+    header.update(store=os.path.relpath(store, path))
+    header.update(generation=int(automaton.generation))
+    text = json.dumps(header, indent=2)
+    _atomic(path / "snapshot.json", lambda x: x.write(text.encode()))
+    return path
+
+
+def load(automaton_class, path, mmap=True, **kwargs):
+    """Restores an automaton from a checkpoint written with `save`.
+    :param automaton_class: Automaton class used to save the checkpoint
+    :param path: Directory with the checkpoint
+    :param mmap: If True, map the rule table read-only instead of reading
+    :param kwargs: Additional keyword arguments for the automaton class
+    :return: Automaton instance at the checkpoint generation
+    """
+    path = Path(path)
+    header = json.loads((path / "snapshot.json").read_text())
+    if header.get("format") != FORMAT or header["version"] > VERSION:
+        raise ValueError(f"Unsupported checkpoint format in {path}")
+    neighbours = np.asarray(automaton_class.neighbours).tolist()
+    if neighbours != header["neighbours"]:
+        raise ValueError("Checkpoint neighbours do not fit automaton class")
+    if automaton_class.states != header["states"]:
+        raise ValueError("Checkpoint states do not fit automaton class")
+    rule_file = path / header["store"] / f"{header['rule']}.npy"
+    rule = np.load(rule_file, mmap_mode="r" if mmap else None)
+    configuration = np.load(path / "configuration.npy")
+    automaton = automaton_class(configuration, rule, **kwargs)
+    automaton.generation = header["generation"]
+    return automaton
+
+
+def _atomic(file, write):
+    suffix = f"{os.getpid()}.{os.urandom(4).hex()}"  # Concurrent savers
+    temporary = file.with_name(f".{file.name}.{suffix}.tmp")
+    try:
+        with open(temporary, "wb") as stream:
+            write(stream)
+            stream.flush()
+            os.fsync(stream.fileno())
+        os.replace(temporary, file)
+    finally:
+        temporary.unlink(missing_ok=True)
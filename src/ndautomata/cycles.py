@@ -0,0 +1,88 @@
+"""Module with tools to detect cycles and fixed points of automata.
+
+Each configuration is hashed and kept in a bounded first in, first out
+history of the last generations. When a hash repeats the automaton has
+entered a cycle and its remaining evolution is known, so stepping loops
+can stop early or jump ahead.
+"""
+import hashlib
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+Cycle = namedtuple("Cycle", ["transient", "period"])
+Cycle.__doc__ = """Generation where the cycle starts and its length.
+A fixed point is a cycle with period 1."""
+
+
+def digest(configuration):
+    """Returns a 128 bit hash of the configuration values and shape.
+    :param configuration: Automaton configuration array
+    :return: Bytes with the configuration hash
+    """
+    array = np.ascontiguousarray(configuration)
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(np.array(array.shape, dtype="int64").tobytes())
+    hasher.update(memoryview(array).cast("B"))
+    return hasher.digest()
+
+
+class CycleDetector:
+    """Detects repeated configurations using a bounded first in, first
+    out history of hashes: the hashes of the last `history` generations
+    are kept. The transient is exact when the cycle repeats within
+    `history` generations, longer periods are not detected.
+
+    Parameters
+    ----------
+    history : PositiveInt
+        Maximum number of configuration hashes to keep.
+
+    Attributes
+    ----------
+    cycle : Cycle or None
+        Detected cycle, None while no configuration has repeated.
+    """
+
+    def __init__(self, history=1024):
+        self.history, self.cycle = history, None
+        self._seen = OrderedDict()  # Configuration hash -> generation
+
+    def update(self, configuration, generation):
+        """Records a configuration and returns the cycle if it repeated.
+        :param configuration: Automaton configuration array
+        :param generation: Generation number of the configuration
+        :return: Cycle instance or None
+        """
+        key = digest(configuration)
+        if key in self._seen:
+            first = self._seen[key]
+            self.cycle = Cycle(first, generation - first)
+            return self.cycle
+        self._seen[key] = generation
+        if len(self._seen) > self.history:
+            self._seen.popitem(last=False)  # Forget the oldest hash
+        return None
+
+
+def run(automaton, steps, detector=None):
+    """Advances the automaton `steps` generations stopping the detailed
+    evolution as soon as a cycle is found. The remaining generations are
+    reduced modulo the period, so the final configuration is the same
+    as evolving all the steps.
+    :param automaton: Automaton instance to evolve in place
+    :param steps: Number of generations to advance
+    :param detector: Optional CycleDetector, a new one if not given
+    :return: Cycle instance or None if no cycle was found
+    """
+    detector = detector or CycleDetector()
+    detector.update(automaton.configuration, 0)
+    for generation in range(1, steps + 1):
+        automaton.evolve(1)
+        cycle = detector.update(automaton.configuration, generation)
+        if cycle is not None:  # Skip whole periods of the remaining steps
+            remaining = steps - generation
+            automaton.evolve(remaining % cycle.period)
+            automaton.generation += remaining - remaining % cycle.period
+            return cycle
+    return None
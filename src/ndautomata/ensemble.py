@@ -0,0 +1,82 @@
+"""Module with tools for the evolution of automata ensembles.
+
+An ensemble stacks many automata of the same class along a leading
+batch axis, so all members advance with a single correlation and a
+single rule gather instead of one Python call per automaton.
+"""
+import numpy as np
+
+from ndautomata import BaseAutomaton, rules
+
+
+class EnsembleAutomaton(BaseAutomaton):
+    """Abstract class for ensembles of automata sharing neighbours and
+    states. Members can share a rule or use one rule each.
+
+    Parameters
+    ----------
+    initial_configuration : (B, N) ndarray
+        Initial configurations stacked along the first (batch) axis.
+    rule :  (N,) or (B, N) ndarray
+        Rule shared by all members, `[states] * neighbours.size`, or
+        stacked rules, `(batch, *[states] * neighbours.size)` or
+        `(batch, states**neighbours.size)`.
+
+    Attributes
+    ----------
+    batch : PositiveInt
+        Number of automata in the ensemble.
+    """
+
+    @classmethod
+    @property
+    def dimensions(cls):
+        return cls.neighbours.ndim + 1
+
+    @classmethod
+    def weights(cls):
+        return super().weights()[np.newaxis]  # Do not mix members
+
+    @property
+    def batch(self):
+        return self.configuration.shape[0]
+
+    @property
+    def rule(self):
+        if self._offsets is None:
+            return super().rule
+        return self._rule.reshape([-1] + [self.states] * self.rule_constrain)
+
+    @rule.setter
+    def rule(self, value):
+        size = self.states**self.rule_constrain
+        shared = (self.states,) * self.rule_constrain
+        stacked = value.ndim == self.rule_constrain + 1  # Else flat rules
+        stacked = stacked or value.ndim == 2 and value.shape != shared
+        if not stacked:
+            BaseAutomaton.rule.fset(self, value)
+            self._offsets = None
+            return
+        if value.shape[0] != self.batch or value[0].size != size:
+            raise ValueError("Stacked rules do not fit batch and neighbours")
+        self._check_states(value)
+        offset = (self.batch - 1) * size  # First entry of the last rule
+        dtype = rules.index_dtype(self._weights, self.states, offset)
+        if hasattr(self, "_dtype") and dtype.itemsize > self._dtype.itemsize:
+            raise ValueError("Stacked rules do not fit the index dtype")
+        offsets = np.arange(self.batch, dtype=dtype) * size
+        self._offsets = offsets.reshape([-1] + [1] * self.neighbours.ndim)
+        self._rule, self._mode = value.ravel(), "clip"
+
+    def _index_dtype(self):
+        if self._offsets is None:
+            return super()._index_dtype()
+        return self._offsets.dtype
+
+    def _fused(self, source, target):
+        return self._offsets is None and super()._fused(source, target)
+
+    def _gather(self, indexes, target, rows=slice(None)):
+        if self._offsets is not None:
+            indexes += self._offsets[rows]  # Index into each member rule
+        return super()._gather(indexes, target)
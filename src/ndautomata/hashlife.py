@@ -0,0 +1,253 @@
+"""Module with a Hashlife engine for 2D binary automata.
+
+Configurations are stored as canonical quadtrees, identical regions are
+the same node object, and the evolution of each node is memoized in a
+bounded least recently used cache. Regions repeated in space or time are
+computed only once and the automaton can jump 2**k generations at once.
+
+The engine keeps the toroidal ("wrap") semantics of `BaseAutomaton`:
+the configuration must be a square with a power of two side, and each
+jump evolves the centre of a node made of four copies of the torus.
+"""
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+from scipy.ndimage import correlate
+
+from ndautomata import BaseAutomaton, neighbours
+
+_nodes = weakref.WeakValueDictionary()  # Canonical nodes by children
+
+
+class Node:
+    """Quadtree node of level `k` covering 2**k x 2**k cells with the
+    children `a` (north-west), `b` (north-east), `c` (south-west) and
+    `d` (south-east). Use `join` to create canonical nodes.
+    """
+
+    __slots__ = ("k", "a", "b", "c", "d", "value", "__weakref__")
+
+    def __init__(self, k, a=None, b=None, c=None, d=None, value=0):
+        self.k, self.a, self.b, self.c, self.d = k, a, b, c, d
+        self.value = value
+
+
+LEAVES = Node(0, value=0), Node(0, value=1)
+
+
+def join(a, b, c, d):
+    """Returns the canonical node with the children a, b, c, d.
+    :param a: North-west child node
+    :param b: North-east child node
+    :param c: South-west child node
+    :param d: South-east child node
+    :return: Node of level `a.k + 1`
+    """
+    key = a, b, c, d
+    node = _nodes.get(key)
+    if node is None:
+        node = _nodes[key] = Node(a.k + 1, a, b, c, d)
+    return node
+
+
+def from_array(array):
+    """Returns the canonical quadtree of a square binary array.
+    :param array: Square array with power of two side and 0/1 values
+    :return: Root node of the quadtree
+    """
+    side = array.shape[0]
+    if array.shape != (side, side) or side & (side - 1):
+        raise ValueError("Expected square array with power of two side")
+    nodes = np.array(LEAVES, dtype=object)[np.asarray(array, dtype=int)]
+    joins = np.frompyfunc(join, 4, 1)
+    while nodes.shape[0] > 1:
+        quadrants = nodes[::2, ::2], nodes[::2, 1::2]
+        quadrants += nodes[1::2, ::2], nodes[1::2, 1::2]
+        nodes = joins(*quadrants)
+    return nodes[0, 0]
+
+
+def to_array(node):
+    """Returns the dense uint8 array represented by a quadtree.
+    :param node: Root node of the quadtree
+    :return: Numpy array with shape (2**k, 2**k)
+    """
+    array = np.empty((2**node.k, 2**node.k), dtype="uint8")
+    blocks = {}
+
+    def fill(node, i, j):
+        if node.k == 0:
+            array[i, j] = node.value
+        elif node in blocks:  # Repeated node, copy the filled block
+            side, (x, y) = 2**node.k, blocks[node]
+            block = array[x:, y:][:side, :side]
+            array[i:, j:][:side, :side] = block
+        else:
+            half = 2 ** (node.k - 1)
+            fill(node.a, i, j)
+            fill(node.b, i, j + half)
+            fill(node.c, i + half, j)
+            fill(node.d, i + half, j + half)
+            blocks[node] = i, j
+
+    fill(node, 0, 0)
+    return array
+
+
+class HashlifeAutomaton(BaseAutomaton):
+    """Abstract class for 2D binary automaton generation with Hashlife.
+    Any rule compatible with a 3x3 neighbourhood, for example
+    `neighbours.regular(ndim=2, r=1)`, can be used.
+
+    Parameters
+    ----------
+    initial_configuration : (N, N) ndarray
+        Square initial configuration with power of two side and 0/1 values.
+    rule :  (N,) ndarray
+        Indexing for next cell value following neighborhood states.
+        `Rule.shape ~= [2] * Automaton.neighbours.size`
+    max_cache : PositiveInt, optional
+        Maximum number of memoized node results, defaults to `max_cache`.
+
+    Attributes
+    ----------
+    root : Node
+        Quadtree with the current configuration.
+    configuration : (N, N) ndarray
+        Dense copy of the current cell states.
+
+    Class Attributes
+    ----------------
+    neighbours :  (3, 3) ndarray
+        Relative indexing for each cell in the cellular automaton.
+    states : PositiveInt
+        Amount of possible states a cell can take, must be 2.
+    max_cache : PositiveInt
+        Default maximum number of memoized node results.
+    """
+
+    neighbours = neighbours.regular(ndim=2, r=1)
+    states = 2
+    max_cache = 2**20
+
+    def __init__(self, initial_configuration, rule, max_cache=None):
+        if self.states != 2 or self.neighbours.shape != (3, 3):
+            raise ValueError("Hashlife requires 2 states and 3x3 neighbours")
+        if self.boundary != "wrap":
+            raise ValueError("Hashlife requires wrap boundary")
+        if initial_configuration.ndim != self.dimensions:
+            raise ValueError("Initial configuration does not fit dimensions")
+        if np.max(initial_configuration) >= self.states:
+            raise ValueError("Initial configuration contains invalid states")
+        self.max_cache = max_cache or self.max_cache
+        self.configuration = initial_configuration
+        self.generation = 0
+        self._weights = self._kernel()
+        self.rule = rule
+
+    @property
+    def configuration(self):
+        return to_array(self.root)
+
+    @configuration.setter
+    def configuration(self, value):
+        self.root = from_array(value)
+
+    @property
+    def rule(self):
+        return super().rule
+
+    @rule.setter
+    def rule(self, value):
+        BaseAutomaton.rule.fset(self, value)
+        self._cache = OrderedDict()  # Results are only valid for a rule
+        bits = np.arange(16).reshape(4, 4)  # 4x4 blocks as 16 bit numbers
+        blocks = (np.arange(2**16)[:, None, None] >> bits) & 1
+        weights = self._weights[None, :, :]  # Skip the blocks axis
+        indexes = correlate(blocks, weights, mode="constant")[:, 1:3, 1:3]
+        centers = self._rule[indexes].astype(int)
+        level1 = [[LEAVES[n >> x & 1] for x in range(4)] for n in range(16)]
+        level1 = [join(*cells) for cells in level1]
+        codes = centers.reshape(-1, 4) @ (1 << np.arange(4))
+        self._base = [level1[x] for x in codes]
+
+    def _successor(self, node, j):
+        j = min(j, node.k - 2)
+        key = node, j
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        if node.k == 2:
+            result = self._base[_code(node)]
+        else:
+            result = self._advance(node, j)
+        self._cache[key] = result
+        if len(self._cache) > self.max_cache:
+            self._cache.popitem(last=False)  # Evict least recently used
+        return result
+
+    def _advance(self, m, j):
+        a, b, c, d = m.a, m.b, m.c, m.d
+        c1 = self._successor(a, j)
+        c2 = self._successor(join(a.b, b.a, a.d, b.c), j)
+        c3 = self._successor(b, j)
+        c4 = self._successor(join(a.c, a.d, c.a, c.b), j)
+        c5 = self._successor(join(a.d, b.c, c.b, d.a), j)
+        c6 = self._successor(join(b.c, b.d, d.a, d.b), j)
+        c7 = self._successor(c, j)
+        c8 = self._successor(join(c.b, d.a, c.d, d.c), j)
+        c9 = self._successor(d, j)
+        if j < m.k - 2:  # Only the first half advances, join the centres
+            return join(
+                join(c1.d, c2.c, c4.b, c5.a),
+                join(c2.d, c3.c, c5.b, c6.a),
+                join(c4.d, c5.c, c7.b, c8.a),
+                join(c5.d, c6.c, c8.b, c9.a),
+            )
+        return join(
+            self._successor(join(c1, c2, c4, c5), j),
+            self._successor(join(c2, c3, c5, c6), j),
+            self._successor(join(c4, c5, c7, c8), j),
+            self._successor(join(c5, c6, c8, c9), j),
+        )
+
+    def jump(self, k):
+        """Advances 2**k generations. Jumps larger than a quarter of the
+        configuration side are done as repeated quarter side jumps.
+        :param k: Base 2 logarithm of the generations to advance
+        """
+        limit = self.root.k - 1  # Level of the torus tiling minus 2
+        for _ in range(2 ** max(k - limit, 0)):
+            torus = join(self.root, self.root, self.root, self.root)
+            centre = self._successor(torus, min(k, limit))
+            self.root = join(centre.d, centre.c, centre.b, centre.a)
+        self.generation += 2**k
+
+    def __next__(self):
+        self.jump(0)
+        return self.configuration
+
+    def evolve(self, steps, out=None, stride=1):
+        if steps < 0 or stride < 1:
+            raise ValueError("Expected steps >= 0 and stride >= 1")
+        bits = [k for k in range(stride.bit_length()) if stride >> k & 1]
+        for step in range(steps):
+            for k in reversed(bits):
+                self.jump(k)
+            if out is not None:
+                out[step] = self.configuration
+        return self.configuration if out is None else out
+
+    evolve.__doc__ = BaseAutomaton.evolve.__doc__
+
+    def _load(self, configuration):
+        self.configuration = configuration  # Built into a quadtree
+
+
+def _code(node):
+    cells = node.a.a, node.a.b, node.b.a, node.b.b
+    cells += node.a.c, node.a.d, node.b.c, node.b.d
+    cells += node.c.a, node.c.b, node.d.a, node.d.b
+    cells += node.c.c, node.c.d, node.d.c, node.d.d
+    return sum(cell.value << bit for bit, cell in enumerate(cells))
@@ -0,0 +1,189 @@
+"""Module with the strategies to compute the rule indexes of the cells.
+
+The rule index of a cell is the correlation of the configuration with
+the weight kernel. It can be computed with:
+
+- "dense": `scipy.ndimage.correlate` over the kernel bounding box.
+- "shifted": Sum of the configuration views shifted by each neighbour
+  offset, read from a buffer padded once following the boundary. Cost
+  grows with the number of neighbours, not the bounding box.
+- "separable": Horner-style accumulation of shifted views with a pass
+  per axis, each pass reuses the partial indexes of the previous axes,
+  so cost grows with the sum of the kernel lengths. Only for kernels
+  that are the outer product of one vector per axis, as the kernels of
+  `neighbours.regular` and `neighbours.orthogonal`.
+
+With "auto" the strategy with the lowest estimated cost is used.
+"""
+import numpy as np
+from scipy.ndimage import correlate
+
+from ndautomata import boundaries
+
+STRATEGIES = ("dense", "shifted", "separable")
+DENSE = 3.0, 1.2  # Estimated ns per cell of a call and of a neighbour
+SHIFT = {1: 0.3, 2: 0.5, 4: 1.0, 8: 3.3}  # ns per cell and view by size
+PAD = 0.5  # Estimated ns per cell to pad a configuration
+
+
+def factors(weights):
+    """Returns the vectors whose outer product is the weight kernel.
+    :param weights: Correlation kernel with non negative integer weights
+    :return: List with an integer array for each axis, None if the
+        kernel is not separable
+    """
+    kernel = np.asarray(weights, dtype=object)
+    if not kernel.all():  # Zero weights break the outer product
+        return None
+    corner = np.unravel_index(np.argmin(kernel), kernel.shape)
+    vectors = []
+    for axis in range(kernel.ndim):
+        line = list(corner)
+        line[axis] = slice(None)
+        vectors.append(kernel[tuple(line)])
+    scale = kernel[corner]
+    if any(x % scale for vector in vectors[1:] for x in vector):
+        return None
+    vectors[1:] = [vector // scale for vector in vectors[1:]]
+    product = vectors[0]
+    for vector in vectors[1:]:
+        product = np.multiply.outer(product, vector)
+    if not np.array_equal(product, kernel):
+        return None
+    return [[int(x) for x in vector] for vector in vectors]
+
+
+def cost(weights, strategy, dtype="uint32"):
+    """Returns the estimated cost of computing the index of a cell.
+    :param weights: Correlation kernel with the rule index weights
+    :param strategy: Strategy name, one of `STRATEGIES`
+    :param dtype: Dtype of the indexes, defaults to uint32
+    :return: Estimated nanoseconds per cell, infinite if the strategy
+        cannot be used with the kernel
+    """
+    shift = SHIFT[np.dtype(dtype).itemsize]
+    if strategy == "dense":
+        return DENSE[0] + DENSE[1] * np.count_nonzero(weights)
+    if strategy == "shifted":
+        return PAD + shift * np.count_nonzero(weights)
+    vectors = factors(weights)
+    if vectors is None:
+        return np.inf
+    taps = [len(x) for x in vectors if len(x) > 1]  # Skip batch axes
+    return sum(PAD + shift * length for length in taps)
+
+
+def choose(weights, dtype="uint32"):
+    """Returns the strategy with the lowest estimated cost for a kernel.
+    :param weights: Correlation kernel with the rule index weights
+    :param dtype: Dtype of the indexes, defaults to uint32
+    :return: Strategy name, one of `STRATEGIES`
+    """
+    return min(STRATEGIES, key=lambda x: cost(weights, x, dtype))
+
+
+class Indexer:
+    """Computes the rule indexes of configurations with a fixed shape,
+    keeping the buffers the strategy needs between calls. Instances are
+    not thread safe, use one for each thread.
+
+    Parameters
+    ----------
+    weights : (N,) ndarray
+        Correlation kernel with the rule index weights.
+    boundary : str
+        How cells outside the configuration are read, see `boundaries`.
+    cval : int
+        State of the cells outside for the "constant" boundary.
+    strategy : str, optional
+        One of `STRATEGIES` or "auto" (default) to use `choose` with
+        the dtype of the first output.
+
+    Attributes
+    ----------
+    strategy : str
+        Strategy used to compute the indexes.
+    """
+
+    def __init__(self, weights, boundary, cval, strategy="auto"):
+        if strategy not in (*STRATEGIES, "auto"):
+            raise ValueError(f"Unknown indexing {strategy}")
+        vectors = factors(weights)
+        if strategy == "separable" and vectors is None:
+            raise ValueError("Weights are not a separable kernel")
+        self.weights, self.boundary, self.cval = weights, boundary, cval
+        self.strategy, self._buffers = strategy, None
+        positions = np.argwhere(weights != 0).tolist()
+        terms = [(x, int(weights[tuple(x)])) for x in positions]
+        halo = [(x // 2, x - x // 2 - 1) for x in weights.shape]
+        self._shifts = [(halo, terms)]  # Single pass over the neighbours
+        if vectors is not None:
+            self._passes = []
+            scale = 1  # Axes of length 1 only scale the indexes
+            for axis, vector in enumerate(vectors):
+                if len(vector) == 1:
+                    scale *= vector[0]
+                    continue
+                halo = [(0, 0)] * weights.ndim
+                halo[axis] = len(vector) // 2, (len(vector) - 1) // 2
+                starts = [[0] * weights.ndim for _ in vector]
+                for tap, start in enumerate(starts):
+                    start[axis] = tap
+                self._passes.insert(0, (halo, list(zip(starts, vector))))
+            if not self._passes:  # Kernel of a single cell
+                self._passes = [([(0, 0)] * weights.ndim, [])]
+            halo, terms = self._passes[0]
+            terms = [(x, weight * scale) for x, weight in terms]
+            self._passes[0] = halo, terms or [([0] * weights.ndim, scale)]
+
+    def __call__(self, source, output):
+        """Writes the rule indexes of a configuration into `output`.
+        :param source: Configuration array
+        :param output: Integer array with the shape of `source`
+        :return: `output`
+        """
+        if self.strategy == "auto":
+            self.strategy = choose(self.weights, output.dtype)
+        if self.strategy == "dense":
+            mode = boundaries.MODES[self.boundary]
+            return correlate(source, self.weights, output, mode, self.cval)
+        if self.strategy == "shifted":
+            return self._shifted(source, output, self._shifts)
+        return self._shifted(source, output, self._passes)
+
+    def _shifted(self, source, output, passes):
+        if self._buffers is None:  # Only one strategy is used
+            self._buffers = self._allocate(source, output, passes)
+        pads, partial, term = self._buffers
+        array, cval = source, self.cval
+        for number, (halo, terms) in enumerate(passes):
+            padded = pads[number]
+            boundaries.pad(array, halo, self.boundary, cval, padded)
+            target = output if number == len(passes) - 1 else partial
+            _accumulate(padded, terms, target, term)
+            cval *= sum(weight for _, weight in terms)  # Outside partials
+            array = target
+        return output
+
+    def _allocate(self, source, output, passes):
+        pads = []
+        for number, (halo, _) in enumerate(passes):
+            shape = [n + a + b for n, (a, b) in zip(source.shape, halo)]
+            dtype = source.dtype if number == 0 else output.dtype
+            pads.append(np.empty(shape, dtype))
+        partial = np.empty_like(output) if len(passes) > 1 else None
+        return pads, partial, np.empty_like(output)
+
+
+def _accumulate(padded, terms, output, term):
+    cast = dict(dtype=output.dtype, casting="unsafe")  # States always fit
+    for number, (start, weight) in enumerate(terms):
+        window = zip(start, output.shape)
+        view = padded[tuple(slice(x, x + n) for x, n in window)]
+        if number == 0:
+            np.multiply(view, weight, out=output, **cast)
+        elif weight == 1:  # Totalistic kernels skip the products
+            np.add(output, view, out=output, **cast)
+        else:
+            np.multiply(view, weight, out=term, **cast)
+            np.add(output, term, out=output)
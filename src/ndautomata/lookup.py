@@ -0,0 +1,113 @@
+"""Module with an engine evaluating rules only where they are needed.
+
+Rule tables with `states**neighbours.size` entries cannot be stored for
+large neighbourhoods. Instead the rule is a function or a mapping that
+is evaluated only for the neighbourhood indexes present in a generation,
+each distinct index once, and the results are memoized so patterns that
+repeat between generations cost a single lookup.
+"""
+import threading
+from collections.abc import Mapping
+
+import numpy as np
+
+from ndautomata import BaseAutomaton, rules
+
+
+class LookupAutomaton(BaseAutomaton):
+    """Abstract class for automata with rules evaluated on demand. The
+    memo is a sorted array of indexes searched with `numpy.searchsorted`,
+    when it exceeds `max_memo` entries the least recently used are
+    evicted.
+
+    Parameters
+    ----------
+    initial_configuration : (N,) ndarray
+        Initial configuration for all the automaton cells.
+    rule : callable or Mapping
+        Function of a `rules.Neighbourhoods` batch returning the next
+        state of each neighbourhood, as in `rules.build`, or mapping of
+        rule indexes to next states, missing indexes map to `default`.
+
+    Attributes
+    ----------
+    hits : int
+        Number of distinct indexes found in the memo.
+    misses : int
+        Number of distinct indexes evaluated with the rule.
+
+    Class Attributes
+    ----------------
+    max_memo : PositiveInt
+        Maximum number of memoized index states.
+    default : int
+        Next state of the indexes missing in a mapping rule.
+    """
+
+    max_memo = 2**20
+    default = 0
+
+    @property
+    def rule(self):
+        return self._lookup
+
+    @rule.setter
+    def rule(self, value):
+        if not callable(value) and not isinstance(value, Mapping):
+            raise TypeError("Expected callable or Mapping for rule value")
+        self._lookup, self._lock = value, threading.Lock()
+        self._keys = np.empty(0, dtype="int64")  # Sorted memo indexes
+        self._values = np.empty(0, dtype="uint8")
+        self._stamps = np.empty(0, dtype="int64")  # Last use of each key
+        self._calls = self.hits = self.misses = 0
+
+    def _fused(self, source, target):
+        return False  # There is no table for the fused kernel
+
+    def _gather(self, indexes, target, rows=slice(None)):
+        unique, inverse = np.unique(indexes, return_inverse=True)
+        with self._lock:  # Tiles share the memo
+            values = self._recall(unique)
+        target[...] = values[inverse].reshape(target.shape)
+        return target
+
+    def _recall(self, unique):
+        self._calls += 1
+        found = np.searchsorted(self._keys, unique)
+        hit = found < self._keys.size
+        hit[hit] = self._keys[found[hit]] == unique[hit]
+        values = np.empty(unique.size, dtype="uint8")
+        values[hit] = self._values[found[hit]]
+        self._stamps[found[hit]] = self._calls
+        misses = int(np.count_nonzero(~hit))
+        self.hits += unique.size - misses
+        self.misses += misses
+        if misses:
+            values[~hit] = self._evaluate(unique[~hit])
+            self._memorize(unique[~hit], values[~hit])
+        return values
+
+    def _evaluate(self, indexes):
+        if isinstance(self._lookup, Mapping):
+            get = self._lookup.get
+            values = [get(int(x), self.default) for x in indexes]
+        else:
+            batch = rules.Neighbourhoods(self.neighbours, self.states,
+                                         indexes.astype("int64"))
+            values = self._lookup(batch)
+        values = np.asarray(values).reshape(indexes.shape)
+        if np.any(values < 0) or np.any(values >= self.states):
+            raise ValueError("Rule returned invalid state values")
+        return values
+
+    def _memorize(self, keys, values):
+        found = np.searchsorted(self._keys, keys)  # Insert keeping order
+        self._keys = np.insert(self._keys, found, keys)
+        self._values = np.insert(self._values, found, values)
+        self._stamps = np.insert(self._stamps, found, self._calls)
+        if self._keys.size > self.max_memo:  # Keep most recently used
+            kept = np.argpartition(-self._stamps, self.max_memo - 1)
+            kept = np.sort(kept[: self.max_memo])
+            self._keys = self._keys[kept]
+            self._values = self._values[kept]
+            self._stamps = self._stamps[kept]
@@ -0,0 +1,160 @@
+"""Module with a multi-step engine for 1D automata.
+
+The rule is composed with itself into a block table mapping each window
+of `(width - 1) * k + 1` cells to the state of its centre cell after `k`
+generations, so a single correlation and gather advance `k` generations.
+The number of steps `k` is the largest whose table fits `cache_size`
+bytes, and tables are cached per rule and shared between automata.
+
+Cells outside the window are never read while composing, so the table is
+only exact for the toroidal ("wrap") boundary.
+"""
+from collections import OrderedDict
+
+import numpy as np
+from scipy.ndimage import correlate1d
+
+from ndautomata import BaseAutomaton, rules
+
+_tables = OrderedDict()  # Block tables by kernel, rule and steps
+max_tables = 8  # Maximum number of cached block tables
+
+
+class MultiStepAutomaton(BaseAutomaton):
+    """Abstract class for 1D automaton generation advancing several
+    generations per pass with a precomputed block rule table. Generations
+    that do not fill a block, for example with `stride` lower than the
+    block steps, are evolved one by one with the base engine.
+
+    Parameters
+    ----------
+    initial_configuration : (N,) ndarray
+        Initial configuration for all the automaton cells.
+    rule :  (N,) ndarray
+        Indexing for next cell value following neighborhood states.
+        `Rule.shape ~= [Automaton.states] * Automaton.neighbours.size`
+
+    Attributes
+    ----------
+    steps : PositiveInt
+        Generations advanced by each pass of the block table.
+    table : (N,) ndarray
+        Read-only block table indexed by the states of the cell windows.
+
+    Class Attributes
+    ----------------
+    neighbours :  (N,) ndarray
+        Relative indexing for each cell in the cellular automaton.
+    states : PositiveInt
+        Amount of possible states a cell can take.
+    cache_size : PositiveInt
+        Maximum size in bytes of the block table, defaults to 256 KiB so
+        the table stays in the L2 cache.
+    max_steps : PositiveInt
+        Maximum generations advanced by each pass.
+    """
+
+    cache_size: int = 2**18
+    max_steps: int = 32
+
+    def __init__(self, initial_configuration, rule, *args, **kwargs):
+        if self.dimensions != 1:
+            raise ValueError("Multi-step tables require 1D neighbours")
+        if self.boundary != "wrap":
+            raise ValueError("Multi-step tables require wrap boundary")
+        super().__init__(initial_configuration, rule, *args, **kwargs)
+        self._spare = None  # Configuration buffer for the block passes
+
+    @property
+    def rule(self):
+        return super().rule
+
+    @rule.setter
+    def rule(self, value):
+        BaseAutomaton.rule.fset(self, value)
+        self._table = None  # Block tables are only valid for a rule
+
+    @property
+    def steps(self):
+        width, steps = self._weights.size, 1
+        while steps < self.max_steps:
+            size = (width - 1) * (steps + 1) + 1  # Window of one more step
+            if self.states**size > self.cache_size:
+                break
+            steps += 1
+        return steps
+
+    @property
+    def table(self):
+        if self._table is None:
+            self._table = self._compose(self.steps)
+            size = (self._weights.size - 1) * self.steps + 1
+            self._powers = self.states ** np.arange(size)[::-1]
+            self._powers = self._powers.astype("uint")
+            self._origin = self._weights.size // 2 * self.steps - size // 2
+            dtype = rules.index_dtype(self._powers, self.states)
+            self._block_indexes = np.empty(self.configuration.shape, dtype)
+        return self._table
+
+    def _compose(self, steps):
+        weights, rule = self._weights, self._rule
+        key = weights.tobytes(), rule.tobytes(), self.states, steps
+        if key in _tables:
+            _tables.move_to_end(key)
+            return _tables[key]
+        size = (weights.size - 1) * steps + 1
+        codes = np.arange(self.states**size)[:, None]
+        powers = self.states ** np.arange(size)[::-1]
+        windows = (codes // powers % self.states).astype("uint8")
+        kernel = weights.astype("int64")
+        views = np.lib.stride_tricks.sliding_window_view
+        for _ in range(steps):  # Each generation shrinks the windows
+            indexes = views(windows, weights.size, axis=1) @ kernel
+            windows = np.take(rule, indexes, mode=self._mode)
+        table = windows[:, 0]
+        table.setflags(write=False)
+        _tables[key] = table
+        if len(_tables) > max_tables:
+            _tables.popitem(last=False)  # Evict least recently used
+        return table
+
+    def _block_transition(self, source, target):
+        table, indexes = self.table, self._block_indexes
+        powers, origin = self._powers, self._origin
+        correlate1d(source, powers, output=indexes, mode="wrap", origin=origin)
+        if target.dtype != table.dtype:  # numpy.take out needs its dtype
+            target[...] = np.take(table, indexes)
+            return target
+        return np.take(table, indexes, out=target)
+
+    def evolve(self, steps, out=None, stride=1):
+        if steps < 0 or stride < 1:
+            raise ValueError("Expected steps >= 0 and stride >= 1")
+        shape = (steps, *self.configuration.shape)
+        if out is not None and out.shape != shape:
+            raise ValueError(f"Output shape does not fit {shape}")
+        if self.steps == 1:  # No block table fits the cache
+            return BaseAutomaton.evolve(self, steps, out, stride)
+        records = [stride] * steps if out is not None else [steps * stride]
+        for step, generations in enumerate(records):
+            blocks, rest = divmod(generations, self.steps)
+            for _ in range(blocks):
+                self._advance()
+            if rest:  # Generations that do not fill a block
+                BaseAutomaton.evolve(self, 1, None, rest)
+            if out is not None:
+                out[step] = self.configuration
+        adopted = self._adopted
+        if adopted is not None and self.configuration is not adopted:
+            adopted[...] = self.configuration  # Keep the caller buffer
+            self._spare, self.configuration = self.configuration, adopted
+        return self.configuration if out is None else out
+
+    evolve.__doc__ = BaseAutomaton.evolve.__doc__
+
+    def _advance(self):
+        if self._spare is None:
+            self._spare = np.empty_like(self.configuration)
+        current = self._block_transition(self.configuration, self._spare)
+        self._spare, self.configuration = self.configuration, current
+        self.generation += self.steps
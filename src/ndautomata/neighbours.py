@@ -1,8 +1,138 @@
-"""Module with tools for automaton definitions."""
-from functools import reduce
+"""Module with tools for automaton definitions.
+
+Neighbourhoods are immutable `Neighbourhood` arrays, equal definitions
+are the same object, so the data derived from them, weight kernels per
+number of states, offsets, halos and masks, is computed once and shared
+by all the automata using them.
+
+All the constructors return read-only neighbourhoods, writing into them
+raises a ValueError. Copy them with `numpy.array` to edit the values and
+wrap the result in `Neighbourhood` to use it in an automaton.
+"""
+import threading
+import weakref
+from functools import cached_property, reduce
 
 import numpy as np
 
+_neighbourhoods = weakref.WeakValueDictionary()  # Canonical by values
+_lock = threading.Lock()
+
+
+class Neighbourhood(np.ndarray):
+    """Read-only and hashable array with the neighbour indexing of an
+    automaton. Creating a neighbourhood with the values of an existing
+    one returns the existing object, so it can be used as a cache key.
+    Arrays derived from a neighbourhood, for example with `ravel` or
+    slicing, are not hashable and comparisons return regular arrays.
+
+    Parameters
+    ----------
+    values : (N,) array_like
+        Non negative neighbour indexing, 0 for cells that are not
+        neighbours, with odd or even lengths along each axis.
+
+    Attributes
+    ----------
+    offsets : (K, ndim) ndarray
+        Positions of the neighbours relative to the cell, in C order.
+    values : (K,) ndarray
+        Neighbour value of each offset.
+    mask : (N,) ndarray
+        True where the position is a neighbour.
+    centre : tuple
+        Position of the cell inside the array.
+    halo : tuple
+        Cells read before and after the cell along each axis.
+    """
+
+    def __new__(cls, values):
+        if isinstance(values, Neighbourhood) and values._key is not None:
+            return values
+        array = np.array(values, dtype="int64")
+        if array.ndim == 0 or array.size == 0 or np.min(array) < 0:
+            raise ValueError("Expected a non empty array of values >= 0")
+        key = array.shape, array.tobytes()
+        with _lock:
+            neighbourhood = _neighbourhoods.get(key)
+            if neighbourhood is None:
+                neighbourhood = array.view(cls)
+                neighbourhood.setflags(write=False)
+                neighbourhood._key, neighbourhood._kernels = key, {}
+                _neighbourhoods[key] = neighbourhood
+        return neighbourhood
+
+    def __array_finalize__(self, obj):
+        self._key, self._kernels = None, {}  # Views are not canonical
+
+    def __array_wrap__(self, array, context=None, return_scalar=False):
+        array = np.asarray(array)  # Ufunc results are regular arrays
+        return array[()] if array.ndim == 0 else array
+
+    def __hash__(self):
+        if self._key is None:
+            raise TypeError("Derived neighbourhood arrays are unhashable")
+        return hash(self._key)
+
+    def __reduce__(self):
+        if self._key is None:
+            return np.asarray(self).__reduce__()
+        return Neighbourhood, (np.asarray(self),)
+
+    def __repr__(self):
+        return f"Neighbourhood({np.asarray(self).tolist()})"
+
+    def weights(self, states):
+        """Returns the correlation kernel mapping the states of a cell
+        neighbourhood into the flat index of the rule table.
+        :param states: Number of possible cell states
+        :return: Read-only uint array with the neighbourhood shape
+        """
+        kernel = self._kernels.get(states)
+        if kernel is None:
+            powers = np.asarray(self, dtype=object) - 1
+            kernel = np.where(powers >= 0, states**powers, 0)
+            if np.max(kernel) >= 2**53:  # See `rules.MAX_INDEX`
+                raise ValueError("Neighbour weights exceed the index range")
+            kernel = kernel.astype("uint")
+            kernel.setflags(write=False)
+            self._kernels[states] = kernel
+        return kernel
+
+    def terms(self, states):
+        """Returns the neighbours with non zero weight and their weight,
+        to compute rule indexes without the dense kernel.
+        :param states: Number of possible cell states
+        :return: Tuple with the offsets and their integer weights
+        """
+        return self.offsets, self.weights(states)[self.mask]
+
+    @cached_property
+    def offsets(self):
+        offsets = np.argwhere(self.mask) - np.array(self.centre)
+        offsets.setflags(write=False)
+        return offsets
+
+    @cached_property
+    def values(self):
+        values = np.asarray(self)[self.mask]
+        values.setflags(write=False)
+        return values
+
+    @cached_property
+    def mask(self):
+        mask = np.asarray(self) != 0
+        mask.setflags(write=False)
+        return mask
+
+    @cached_property
+    def centre(self):
+        return tuple(dim // 2 for dim in self.shape)
+
+    @cached_property
+    def halo(self):
+        return tuple((dim // 2, dim - dim // 2 - 1) for dim in self.shape)
+
 
 def regular(ndim, r):
     """Returns neighbours indexing for regular cell connections.
@@ -17,7 +147,7 @@ def regular(ndim, r):
 
     :param ndim: Number of cell dimensions with neighbours
     :param r: Cell radius, distance a cell is considered a neighbour
-    :return: Numpy array with neighbour indexing
+    :return: Read-only Neighbourhood with neighbour indexing
     """
     if ndim < 1 or r < 1:
         raise ValueError
@@ -31,24 +161,25 @@ def hexagonal(ndim, r):
      |     |     |     |  |     |     |     |    / \ / \ / \
      |     |-1,0 |-1,+1|  |  0  |  7  |  6  |   |0,0|0,1|0,2|
      |-----|-----|-----|  |-----|-----|-----|    \ / \ / \ / \
-     | 0,-1| i,j | 0,+1|  |  4  |  4  |  3  |     |1,0|1,1|1,2|
+     | 0,-1| i,j | 0,+1|  |  5  |  4  |  3  |     |1,0|1,1|1,2|
      |-----|-----|-----|  |-----|-----|-----|      \ / \ / \ / \
      |+1,-1|+1,0 |     |  |  2  |  1  |  0  |       |2,0|2,1|2,2|
      |_____|_____|_____|  |_____|_____|_____|        \ / \ / \ /
 
+    In 3D the neighbours are the 12 cells of a face centred cubic
+    lattice, in general the offsets with at most one +1 and one -1.
+
     :param ndim: Number of cell dimensions with neighbours
     :param r: Cell radius, distance a cell is considered a neighbour
-    :return: Numpy array with neighbour indexing
+    :return: Read-only Neighbourhood with neighbour indexing
     """  # noqa: W605
-    if ndim > 2 or r > 1:  # TODO: Implement for more than 2 dimensions
+    if r > 1:
         raise NotImplementedError
     if ndim < 1 or r < 1:
         raise ValueError
-    neighbours = regular(ndim, r)
-    neighbours[:] -= 1
-    neighbours[0, 0] = 0
-    neighbours[2, 2] = 0
-    return neighbours
+    box = np.indices([3] * ndim).reshape(ndim, -1).T - 1
+    skewed = (np.sum(box == 1, 1) <= 1) & (np.sum(box == -1, 1) <= 1)
+    return sparse(box[skewed])
 
 
 def orthogonal(size):
@@ -65,7 +196,43 @@ def orthogonal(size):
      |_____|_____|_____|_____|  |_____|_____|_____|_____|
 
     :param size: Shape of connections
-    :return: Numpy array with neighbour indexing
+    :return: Read-only Neighbourhood with neighbour indexing
     """
     n_neighbours = reduce((lambda x, y: x * y), size)
-    return np.arange(n_neighbours, 0, -1).reshape(size)
+    return Neighbourhood(np.arange(n_neighbours, 0, -1).reshape(size))
+
+
+def von_neumann(ndim, r):
+    """Returns neighbour indexing for the cells at a Manhattan distance
+    lower or equal to `r`, in 2D with r=1 the cell and its 4 orthogonal
+    neighbours.
+    :param ndim: Number of cell dimensions with neighbours
+    :param r: Cell radius, distance a cell is considered a neighbour
+    :return: Read-only Neighbourhood with neighbour indexing
+    """
+    if ndim < 1 or r < 1:
+        raise ValueError
+    box = np.indices([1 + 2 * r] * ndim).reshape(ndim, -1).T - r
+    return sparse(box[np.abs(box).sum(1) <= r])
+
+
+def sparse(offsets):
+    """Returns neighbour indexing for an arbitrary set of neighbours.
+    Offsets are numbered in descending C order as `orthogonal`, so the
+    first offset is the first axis of the rule table.
+    :param offsets: (K, ndim) integer array with the neighbour positions
+        relative to the cell, duplicates are ignored
+    :return: Read-only Neighbourhood centred in the cell with neighbour
+        indexing
+    """
+    offsets = np.unique(np.asarray(offsets, dtype="int64"), axis=0)
+    if offsets.ndim != 2 or offsets.size == 0:
+        raise ValueError("Expected a (K, ndim) array of offsets")
+    radius = np.abs(offsets).max(0)  # Centred box around the cell
+    values = np.zeros(tuple(2 * radius + 1), dtype="int64")
+    values[tuple((offsets + radius).T)] = np.arange(len(offsets), 0, -1)
+    neighbourhood = Neighbourhood(values)
+    if "offsets" not in neighbourhood.__dict__:  # Skip scanning the box
+        offsets.setflags(write=False)
+        neighbourhood.offsets = offsets
+    return neighbourhood
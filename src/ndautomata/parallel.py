@@ -0,0 +1,57 @@
+"""Module with tools for multi-core tiled automaton evolution.
+
+Configurations are split along the first axis into tiles that are
+evolved on a shared thread pool. SciPy correlations, NumPy gathers and
+numba kernels release the GIL, so tiles run concurrently. Each tile
+reads a halo of rows around it, taken following the automaton boundary,
+so the results are the same as evolving the whole configuration at once.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+from ndautomata import boundaries
+
+
+@lru_cache(maxsize=None)
+def executor(workers):
+    """Returns a thread pool shared by all automata with `workers` threads.
+    :param workers: Number of threads in the pool
+    :return: ThreadPoolExecutor instance
+    """
+    return ThreadPoolExecutor(workers, thread_name_prefix="ndautomata")
+
+
+def tiles(length, workers):
+    """Splits an axis into contiguous tiles of similar length.
+    :param length: Length of the axis to split
+    :param workers: Maximum number of tiles to return
+    :return: List of (start, stop) tuples
+    """
+    bounds = np.linspace(0, length, min(workers, length) + 1).astype(int)
+    return list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+
+def halo(source, start, stop, before, after, boundary="wrap", cval=0):
+    """Returns rows `[start - before, stop + after)` of `source` along
+    the first axis, rows outside follow the boundary. The result is a
+    view of `source` when the rows do not cross a border.
+    :param source: Automaton configuration array
+    :param start: First row of the tile
+    :param stop: Row after the last row of the tile
+    :param before: Halo rows required before the tile
+    :param after: Halo rows required after the tile
+    :param boundary: Boundary name, see `boundaries.MODES`
+    :param cval: Value of the rows outside for "constant" boundaries
+    :return: Numpy array with `stop - start + before + after` rows
+    """
+    first, last = start - before, stop + after
+    if first >= 0 and last <= source.shape[0]:
+        return source[first:last]
+    rows = range(first, last)
+    rows, outside = boundaries.fold(rows, source.shape[0], boundary)
+    array = source.take(rows, axis=0)
+    if outside is not None:
+        array[outside] = cval
+    return array
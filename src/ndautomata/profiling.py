@@ -0,0 +1,167 @@
+"""Module with tools to profile the evolution of automata.
+
+A profiler wraps the internal phases of an automaton instance, so
+automata without an attached profiler run the original methods and
+pay no cost. Phases are nested, "transition" includes "correlate" and
+"gather" unless the fused numba kernel computes both at once. With
+several workers the tiles are profiled in their threads, and the memory
+peaks are approximate as `tracemalloc` traces all threads together.
+"""
+import threading
+import tracemalloc
+from collections import namedtuple
+from time import perf_counter
+
+PHASES = {
+    "transition": "_transition",  # Whole generation
+    "correlate": "_indexes",  # Neighbour indexes correlation
+    "gather": "_gather",  # Rule table lookup
+    "copy": "_copy",  # Configuration copies returned by next()
+}
+
+Record = namedtuple("Record", ["phase", "seconds", "cells", "bytes"])
+Record.__doc__ = """Single phase call measurement, `bytes` is the peak
+memory allocated during the call or None if memory is not traced."""
+
+
+class Stats:
+    """Accumulated measurements of a profiled phase.
+
+    Attributes
+    ----------
+    calls : int
+        Number of phase calls.
+    seconds : float
+        Total time spent in the phase.
+    cells : int
+        Total number of cells processed by the phase.
+    bytes : int
+        Maximum peak memory allocated in a single call.
+    """
+
+    def __init__(self):
+        self.calls, self.seconds, self.cells, self.bytes = 0, 0.0, 0, 0
+
+    @property
+    def rate(self):
+        return self.cells / self.seconds if self.seconds else float("nan")
+
+
+class Profiler:
+    """Collects per phase timings of the automata it is attached to.
+    Use as a context manager to detach all the automata on exit.
+
+    Parameters
+    ----------
+    callback : callable, optional
+        Function called with a `Record` after each phase call.
+    memory : bool, optional
+        If True, trace the memory allocated in each phase call with
+        `tracemalloc`, adds a significant overhead. Defaults to False.
+
+    Attributes
+    ----------
+    stats : dict
+        `Stats` instance for each phase name that has been called.
+    """
+
+    def __init__(self, callback=None, memory=False):
+        self.callback, self.memory = callback, memory
+        self.stats, self._attached = {}, []
+        self._lock, self._tracing = threading.Lock(), False
+        self._frames = threading.local()  # Peaks of the running phases
+
+    def attach(self, automaton, phases=None):
+        """Starts profiling the phases of an automaton instance.
+        :param automaton: Automaton instance to profile
+        :param phases: Phase names to profile, defaults to all `PHASES`
+        :return: The profiler instance
+        """
+        for phase in phases or PHASES:
+            method = getattr(automaton, PHASES[phase], None)
+            if method is not None and PHASES[phase] not in vars(automaton):
+                wrapper = self._wrap(phase, method)
+                setattr(automaton, PHASES[phase], wrapper)
+        if automaton not in self._attached:
+            self._attached.append(automaton)
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True  # Stop tracing when done
+        return self
+
+    def detach(self, automaton):
+        """Stops profiling an automaton restoring its original methods.
+        :param automaton: Automaton instance to stop profiling
+        """
+        for name in PHASES.values():
+            if getattr(vars(automaton).get(name), "_profiler", None) is self:
+                delattr(automaton, name)
+        self._attached.remove(automaton)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        for automaton in list(self._attached):
+            self.detach(automaton)
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+    def reset(self):
+        """Discards all the collected measurements."""
+        self.stats = {}
+
+    def report(self):
+        """Returns a text table with the collected measurements.
+        :return: String with one line per phase
+        """
+        lines = [f"{'phase':<12}{'calls':>8}{'total s':>12}"
+                 f"{'mean ms':>12}{'cells/s':>14}{'peak bytes':>14}"]
+        for phase, stats in self.stats.items():
+            mean = stats.seconds / stats.calls * 1e3
+            lines.append(f"{phase:<12}{stats.calls:>8}{stats.seconds:>12.4f}"
+                         f"{mean:>12.4f}{stats.rate:>14.4g}{stats.bytes:>14}")
+        return "\n".join(lines)
+
+    def _wrap(self, phase, method):
+        def wrapper(array, *args, **kwargs):
+            start = self._enter() if self.memory else None
+            time = perf_counter()
+            result = method(array, *args, **kwargs)
+            time = perf_counter() - time
+            size = self._exit(start) if self.memory else None
+            self._record(Record(phase, time, array.size, size))
+            return result
+
+        wrapper._profiler = self
+        return wrapper
+
+    def _enter(self):
+        # Inner phases reset the tracemalloc peak, the peaks they wipe
+        # are carried to the enclosing phases in a per thread stack
+        stack = self._frames.__dict__.setdefault("stack", [])
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1][1] = max(stack[-1][1], peak)
+        tracemalloc.reset_peak()
+        stack.append([current, 0])
+        return current
+
+    def _exit(self, start):
+        stack = self._frames.stack
+        _, peak = tracemalloc.get_traced_memory()
+        peak = max(peak, stack.pop()[1])
+        if stack:
+            stack[-1][1] = max(stack[-1][1], peak)
+        return peak - start
+
+    def _record(self, record):
+        with self._lock:  # Tiles may record from several threads
+            stats = self.stats.setdefault(record.phase, Stats())
+            stats.calls += 1
+            stats.seconds += record.seconds
+            stats.cells += record.cells
+            stats.bytes = max(stats.bytes, record.bytes or 0)
+        if self.callback is not None:
+            self.callback(record)
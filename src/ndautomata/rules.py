@@ -0,0 +1,343 @@
+"""Module with tools for rule tables."""
+import hashlib
+import os
+from functools import cached_property
+from itertools import permutations, product
+from pathlib import Path
+
+import numpy as np
+
+MAX_INDEX = 2**53  # Correlations are exact up to float64 precision
+
+
+class CompiledRule:
+    """Compact rule table with its remapped weight kernel. Neighbour
+    positions with weight 0 are dropped and positions sharing the same
+    neighbour value are merged into a single digit holding their sum,
+    so only reachable indexes are stored.
+
+    Symmetric rules are detected but still stored with one entry per
+    reachable index rather than per equivalence class: gathering through
+    a class map would need a second lookup table as large as the rule.
+    Use `equivalence_classes` to store or compare them by class.
+
+    Attributes
+    ----------
+    table : (N,) ndarray
+        Flat compact rule table.
+    weights : (N,) ndarray
+        Correlation kernel with the shape of the neighbours that maps
+        cell neighbourhoods into `table` indexes.
+    indexes : (N,) ndarray
+        Original rule index for each entry of `table`.
+    size : PositiveInt
+        Number of entries in the original rule table.
+    symmetric : bool or None
+        True if the rule is invariant under the neighbours rotations and
+        reflections, see `symmetries`. None if it was not checked.
+    """
+
+    def __init__(self, table, weights, indexes, size, symmetric=None):
+        self.table, self.weights, self.indexes = table, weights, indexes
+        self.size, self.symmetric = size, symmetric
+
+    @property
+    def reduction(self):
+        return self.table.size / self.size
+
+    def expand(self, fill=0):
+        """Returns the flat original rule table, unreachable entries are
+        set to `fill` as their original values are not stored.
+        :param fill: Value for unreachable rule entries
+        :return: Numpy array with `size` entries
+        """
+        rule = np.full(self.size, fill, dtype=self.table.dtype)
+        rule[self.indexes] = self.table
+        return rule
+
+    def report(self, neighbours=None):
+        """Returns a text summary with the rule table reduction.
+        :param neighbours: Optional neighbours to count the rule entries
+            equivalence classes of symmetric rules
+        :return: String with one line per statistic
+        """
+        lines = [
+            f"rule entries: {self.size}",
+            f"compact entries: {self.table.size} ({self.reduction:.2%})",
+        ]
+        if self.symmetric is not None:
+            lines.append(f"symmetric: {self.symmetric}")
+        if self.symmetric and neighbours is not None:
+            states = round(self.size ** (1 / neighbours.size))
+            labels = equivalence_classes(neighbours, states)
+            lines.append(f"symmetry classes: {np.unique(labels).size}")
+        return "\n".join(lines)
+
+
+class Neighbourhoods:
+    """Batch of rule table entries decoded into the neighbourhoods they
+    represent, passed to the functions used to `build` rules. All the
+    attributes are computed on first access.
+
+    Attributes
+    ----------
+    indexes : (N,) ndarray
+        Flat rule table index of each neighbourhood.
+    cells : (N, *neighbours.shape) ndarray
+        States of the cells in each neighbourhood, positions without
+        neighbour value are 0.
+    centre : (N,) ndarray
+        State of the cell at the centre of each neighbourhood.
+    counts : (N, states) ndarray
+        Number of neighbours in each state, excluding the centre.
+    sum : (N,) ndarray
+        Sum of the neighbours states, excluding the centre.
+    """
+
+    def __init__(self, neighbours, states, indexes, digits=None):
+        self.neighbours, self.states = neighbours, states
+        self.indexes, self._digits = indexes, digits
+
+    @cached_property
+    def cells(self):
+        digits = self._digits  # Base `states` digits of the indexes
+        if digits is None:
+            powers = self.states ** np.arange(self.neighbours.size)
+            digits = self.indexes[:, None] // powers % self.states
+        values = self.neighbours.ravel()
+        cells = digits[:, np.maximum(values - 1, 0)].astype("uint8")
+        cells[:, values == 0] = 0
+        return cells.reshape(self.indexes.size, *self.neighbours.shape)
+
+    @cached_property
+    def centre(self):
+        centre = tuple(dim // 2 for dim in self.neighbours.shape)
+        return self.cells[(slice(None), *centre)]
+
+    @cached_property
+    def counts(self):
+        cells = self._neighbours
+        counts = [np.count_nonzero(cells == x, axis=1) for x in
+                  range(self.states)]
+        return np.stack(counts, axis=1)
+
+    @cached_property
+    def sum(self):
+        return self._neighbours.sum(axis=1, dtype=int)
+
+    @cached_property
+    def _neighbours(self):  # States of non zero positions but the centre
+        mask = self.neighbours != 0
+        mask[tuple(dim // 2 for dim in mask.shape)] = False
+        return self.cells.reshape(self.indexes.size, -1)[:, mask.ravel()]
+
+
+def build(neighbours, states, function, cache=None, key=None, chunk=2**16):
+    """Builds a rule table evaluating a vectorized function on batches of
+    decoded neighbourhoods, see `Neighbourhoods`. For example, the game
+    of life is `lambda x: (x.sum == 3) | (x.centre == 1) & (x.sum == 2)`.
+    :param neighbours: Relative indexing for each cell neighbour
+    :param states: Number of possible cell states
+    :param function: Function of a Neighbourhoods instance returning
+        the next state of each neighbourhood as an (N,) array
+    :param cache: Optional directory where built tables are stored and
+        loaded from, as read-only memory maps, on later calls
+    :param key: Definition identifier for the cache, defaults to a hash
+        of the function code, constants, defaults and closure values,
+        required if the function depends on global variables or on
+        values other than numbers, strings, arrays, containers of them
+        and functions, otherwise a ValueError is raised
+    :param chunk: Approximate number of rule entries evaluated at once
+    :return: Numpy array with shape `[states] * neighbours.size`
+    """
+    neighbours = np.asarray(neighbours)
+    shape = [states] * neighbours.size
+    if cache is not None:
+        hasher = hashlib.sha256(f"{neighbours.tolist()}{states}".encode())
+        hasher.update(key.encode() if key else _definition(function))
+        file = Path(cache) / f"{hasher.hexdigest()}.npy"
+        if file.exists():
+            return np.load(file, mmap_mode="r").reshape(shape)
+    rule = np.empty(states**neighbours.size, dtype="uint8")
+    low = min(max(int(np.log(chunk) / np.log(states)), 1), neighbours.size)
+    digits = np.empty((states**low, neighbours.size), dtype="uint8")
+    digits[:, :low] = np.indices([states] * low).reshape(low, -1)[::-1].T
+    powers = states ** np.arange(low, neighbours.size)
+    for start in range(0, rule.size, len(digits)):  # Only high digits vary
+        digits[:, low:] = start // powers % states
+        indexes = np.arange(start, start + len(digits))
+        batch = Neighbourhoods(neighbours, states, indexes, digits)
+        values = np.asarray(function(batch))
+        if values.shape != indexes.shape:
+            raise ValueError("Rule function must return one value per entry")
+        if np.any(values < 0) or np.any(values >= states):
+            raise ValueError("Rule function returned invalid state values")
+        rule[start:][: indexes.size] = values
+    if cache is not None:
+        file.parent.mkdir(parents=True, exist_ok=True)
+        temporary = file.with_name(f".{file.name}.{os.getpid()}.tmp")
+        with open(temporary, "wb") as stream:
+            np.save(stream, rule)
+        os.replace(temporary, file)  # Concurrent builds write the same
+    return rule.reshape(shape)
+
+
+def compile(neighbours, states, rule, symmetry=False):
+    """Compiles a rule into a compact table dropping unreachable indexes.
+    :param neighbours: Relative indexing for each cell neighbour
+    :param states: Number of possible cell states
+    :param rule: Rule table with `states**neighbours.size` entries
+    :param symmetry: If True, check if the rule is symmetric, this
+        transposes the whole rule table once per symmetry. Neighbours
+        whose values are not a 1..size permutation are not checked and
+        `symmetric` stays None
+    :return: CompiledRule instance
+    """
+    values, counts = np.unique(neighbours[neighbours != 0], return_counts=True)
+    radices = counts * (states - 1) + 1  # Range of each digit sum
+    places = np.cumprod([1, *radices[:-1]])
+    digits = np.indices(radices[::-1]).reshape(len(radices), -1)[::-1]
+    powers = np.array([states ** int(x - 1) for x in values], dtype=object)
+    indexes = (digits.T.astype(object) @ powers).astype("int64")
+    weights = np.zeros(neighbours.shape, dtype="uint")
+    for value, place in zip(values, places):
+        weights[neighbours == value] = place
+    rule = np.asarray(rule).ravel()
+    symmetric = None  # Not checked
+    if symmetry and _permutation(neighbours):
+        symmetric = is_symmetric(neighbours, rule)
+    return CompiledRule(rule[indexes], weights, indexes, rule.size, symmetric)
+
+
+def index_dtype(weights, states, offset=0):
+    """Returns the narrowest dtype able to hold all the rule indexes.
+    :param weights: Correlation kernel with the rule index weights
+    :param states: Number of possible cell states
+    :param offset: Maximum offset added to the indexes, default 0
+    :return: Numpy dtype, one of uint8, uint16, uint32 or int64
+    """
+    max_index = sum(int(x) for x in np.ravel(weights)) * (states - 1)
+    max_index += offset
+    if max_index >= MAX_INDEX:
+        raise ValueError(
+            f"Rule indexes up to {max_index} cannot be computed exactly, "
+            "use a TotalisticAutomaton or a smaller neighbourhood"
+        )
+    for dtype in ("uint8", "uint16", "uint32"):
+        if max_index <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype("int64")  # Signed, numpy.take does not cast uint64
+
+
+def symmetries(neighbours):
+    """Returns the permutations of the rule table axes induced by the
+    rotations and reflections of the neighbours. Only neighbours with
+    a unique value for each position are supported.
+    :param neighbours: Relative indexing for each cell neighbour
+    :return: List of axes tuples to use with `numpy.transpose`
+    """
+    if not _permutation(neighbours):
+        raise ValueError("Neighbours values must be 1..size permutation")
+    size, axis = neighbours.size, neighbours.size - neighbours.ravel()
+    positions = np.arange(size).reshape(neighbours.shape)
+    found = []
+    for order in permutations(range(neighbours.ndim)):
+        if [neighbours.shape[x] for x in order] != [*neighbours.shape]:
+            continue  # Only axes with the same length can be swapped
+        for flips in product([False, True], repeat=neighbours.ndim):
+            moved = np.transpose(positions, order)
+            moved = np.flip(moved, [a for a, x in enumerate(flips) if x])
+            axes = np.empty(size, dtype=int)
+            axes[axis] = axis[moved.ravel()]
+            if tuple(axes) not in found:
+                found.append(tuple(axes))
+    return found
+
+
+def is_symmetric(neighbours, rule):
+    """Returns True if the rule is invariant under all the neighbours
+    rotations and reflections.
+    :param neighbours: Relative indexing for each cell neighbour
+    :param rule: Rule table with `states**neighbours.size` entries
+    :return: Boolean
+    """
+    rule = np.asarray(rule)
+    states = round(rule.size ** (1 / neighbours.size))
+    rule = rule.reshape([states] * neighbours.size)
+    axes = symmetries(neighbours)
+    return all(np.array_equal(rule, rule.transpose(x)) for x in axes)
+
+
+def canonical(neighbours, rule):
+    """Returns the canonical representative of the rule under the
+    neighbours rotations and reflections, equivalent rules return the
+    same table. The representative is the lexicographically minimum.
+    :param neighbours: Relative indexing for each cell neighbour
+    :param rule: Rule table with `states**neighbours.size` entries
+    :return: Numpy array with the shape of `rule`
+    """
+    rule = np.asarray(rule)
+    states = round(rule.size ** (1 / neighbours.size))
+    table = rule.reshape([states] * neighbours.size)
+    options = [table.transpose(x).ravel() for x in symmetries(neighbours)]
+    return min(options, key=lambda x: x.tolist()).reshape(rule.shape)
+
+
+def equivalence_classes(neighbours, states):
+    """Returns the class of each rule table entry, entries in the same
+    class are mapped into each other by the neighbours symmetries. The
+    class label is the lowest index of the entries in the class.
+    :param neighbours: Relative indexing for each cell neighbour
+    :param states: Number of possible cell states
+    :return: Numpy array with `states**neighbours.size` entries
+    """
+    entries = np.arange(states**neighbours.size)
+    table = entries.reshape([states] * neighbours.size)
+    labels = entries.copy()
+    for axes in symmetries(neighbours):
+        np.minimum(labels, table.transpose(axes).ravel(), out=labels)
+    return labels
+
+
+def _definition(function):
+    parts = [function.__module__, function.__qualname__]
+    parts += [function.__defaults__, function.__kwdefaults__]
+    parts += [cell.cell_contents for cell in function.__closure__ or ()]
+    return _fingerprint(function.__code__) + _fingerprint(parts)
+
+
+def _fingerprint(value):  # Digest of a value stable between processes
+    hasher = hashlib.sha256(type(value).__qualname__.encode())
+    if value is None or isinstance(value, (bool, int, float, complex)):
+        hasher.update(repr(value).encode())
+    elif isinstance(value, (str, bytes)):
+        hasher.update(value.encode() if isinstance(value, str) else value)
+    elif isinstance(value, (np.ndarray, np.generic)):
+        array = np.ascontiguousarray(value)
+        hasher.update(f"{array.dtype.str}{array.shape}".encode())
+        hasher.update(array.tobytes())
+    elif isinstance(value, (tuple, list)):
+        for item in value:
+            hasher.update(_fingerprint(item))
+    elif isinstance(value, dict):
+        for item in value.items():
+            hasher.update(_fingerprint(item))
+    elif isinstance(value, (set, frozenset)):  # Iteration order varies
+        for digest in sorted(_fingerprint(x) for x in value):
+            hasher.update(digest)
+    elif hasattr(value, "co_code"):
+        hasher.update(value.co_code)
+        hasher.update(_fingerprint([value.co_consts, value.co_names]))
+    elif callable(value) and hasattr(value, "__code__"):
+        hasher.update(_definition(value))
+    else:
+        raise ValueError(
+            f"Cannot hash {type(value).__qualname__} values of the rule "
+            "function definition, pass a cache key"
+        )
+    return hasher.digest()
+
+
+def _permutation(neighbours):
+    values = np.sort(neighbours.ravel())
+    return np.array_equal(values, np.arange(1, neighbours.size + 1))
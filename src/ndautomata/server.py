@@ -0,0 +1,396 @@
+"""Module with a local simulation server sharing memory between workers.
+
+A `Server` holds rule tables in shared memory, each table is loaded once
+and attached read-only by every worker process, so large tables are not
+copied per process. Clients connect through a Unix socket, register
+rules by content digest, submit jobs and receive the results as shared
+memory handles they attach to without copies:
+
+    with Server("/tmp/ndautomata.sock") as server:
+        server.start()
+        with Client("/tmp/ndautomata.sock", server.authkey) as client:
+            rule_id = client.add_rule(rule)
+            job = client.submit(Automaton, rule_id, configuration, 100)
+            result = client.result(job)
+            final = result.array.copy()
+            result.release()
+
+Automaton classes are sent as "module:qualname" strings, so they must
+be importable by the workers. Messages are pickled, so connections are
+always authenticated with a key, generated by the server if not given.
+Results not collected with `Client.result` are freed by the server when
+the client disconnects or the server closes.
+"""
+import importlib
+import os
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import AuthenticationError, connection
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from ndautomata import checkpoint
+
+Handle = namedtuple("Handle", ["name", "shape", "dtype"])
+Handle.__doc__ = """Shared memory segment name and array layout."""
+
+_segments = {}  # Segments attached by this process, by name
+
+
+class Result:
+    """Result of a job in a shared memory segment owned by the client,
+    call `release` to free it once the array is no longer used.
+
+    Attributes
+    ----------
+    array : (N,) ndarray
+        Final configuration, or (steps, *shape) generations if the job
+        was submitted with `record=True`.
+    generation : int
+        Generation of the automaton at the end of the job.
+    """
+
+    def __init__(self, handle, generation):
+        self.handle, self.generation = handle, generation
+        self._memory = shared_memory.SharedMemory(handle.name)
+        self.array = _view(self._memory, handle)
+
+    def release(self):
+        """Frees the shared memory segment of the result."""
+        self.array = None
+        self._memory.close()
+        self._memory.unlink()
+
+
+class Server:
+    """Simulation server listening on a Unix socket with a pool of
+    worker processes. Call `start` to serve in a background thread or
+    `serve_forever` to serve in the calling thread.
+
+    Parameters
+    ----------
+    address : str
+        Path of the Unix socket.
+    workers : PositiveInt, optional
+        Number of worker processes, defaults to all cores.
+    authkey : bytes, optional
+        Key clients must use to connect, defaults to a random key.
+
+    Attributes
+    ----------
+    authkey : bytes
+        Key clients must use to connect.
+    rules : dict
+        Shared memory handle of each registered rule, by rule id.
+    """
+
+    def __init__(self, address, workers=None, authkey=None):
+        self.address, self.rules = address, {}
+        self.authkey = os.urandom(32) if authkey is None else authkey
+        self._memory, self._lock = {}, threading.Lock()
+        self._pool = ProcessPoolExecutor(workers or os.cpu_count())
+        listener = address, "AF_UNIX", 16, self.authkey
+        self._listener = connection.Listener(*listener)
+        self._thread, self._closed, self._connections = None, False, set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add_rule(self, rule):
+        """Copies a rule table into shared memory, equal rules are stored
+        only once.
+        :param rule: Rule table array
+        :return: Rule id, the `checkpoint.rule_digest` of the table
+        """
+        rule_id = checkpoint.rule_digest(rule)
+        with self._lock:
+            if rule_id not in self.rules:
+                handle = Handle(None, rule.shape, np.dtype(rule.dtype).str)
+                size = _size(handle)
+                memory = shared_memory.SharedMemory(create=True, size=size)
+                handle = handle._replace(name=memory.name)
+                _view(memory, handle)[...] = rule
+                self.rules[rule_id], self._memory[rule_id] = handle, memory
+        return rule_id
+
+    def start(self):
+        """Serves clients in a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def serve_forever(self):
+        """Accepts clients until the server is closed, each client is
+        served in its own thread."""
+        while not self._closed:
+            try:
+                client = self._listener.accept()
+            except (OSError, EOFError, AuthenticationError):
+                if self._closed:
+                    return
+                continue  # Failed handshakes do not stop the server
+            serve = threading.Thread(target=self._serve, args=(client,))
+            serve.daemon = True
+            serve.start()
+
+    def close(self):
+        """Stops serving, waits for the running jobs and frees the rules
+        and the results not collected. Results collected belong to the
+        clients."""
+        if self._closed:
+            return
+        self._closed = True
+        self._listener.close()
+        self._pool.shutdown()
+        with self._lock:
+            connections = list(self._connections)
+        for client in connections:
+            client.free()
+        for memory in self._memory.values():
+            memory.close()
+            memory.unlink()
+        self._memory.clear()
+
+    def _serve(self, client):
+        client = _Connection(client)
+        with self._lock:
+            self._connections.add(client)
+        try:
+            while True:
+                try:
+                    command, *arguments = client.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    self._command(client, command, *arguments)
+                except Exception as error:
+                    client.send("error", None, error)
+        finally:
+            with self._lock:
+                self._connections.discard(client)
+            client.close()
+
+    def _command(self, client, command, *arguments):
+        if command == "lookup":
+            (rule_id,) = arguments
+            client.send("rule", rule_id if rule_id in self.rules else None)
+        elif command == "rule":
+            client.send("rule", self.add_rule(*arguments))
+        elif command == "submit":
+            job, spec, rule_id, *task = arguments
+            if rule_id not in self.rules:
+                error = KeyError(f"Unknown rule {rule_id}")
+                client.send("error", job, error)
+                return
+            future = self._pool.submit(run, spec, self.rules[rule_id], *task)
+            future.add_done_callback(lambda x: client.reply(job, x))
+        elif command == "collect":
+            (job,) = arguments
+            client.collect(job)  # The client owns the result now
+        else:
+            raise ValueError(f"Unknown command {command}")
+
+
+class _Connection:
+    """Client connection of a server keeping the result handles of the
+    jobs until the client collects them, or freeing them if it cannot.
+    """
+
+    def __init__(self, client):
+        self._client, self._results = client, {}
+        self._lock = threading.Lock()  # Job callbacks run in pool threads
+        self._closed = False
+
+    def recv(self):
+        return self._client.recv()
+
+    def send(self, *message):
+        with self._lock:
+            try:
+                self._client.send(message)
+            except OSError:
+                return False  # The client left
+        return True
+
+    def reply(self, job, future):
+        error = future.exception()
+        if error is not None:
+            self.send("error", job, error)
+            return
+        handle, generation = future.result()
+        with self._lock:
+            if self._closed:
+                _unlink(handle)
+                return
+            self._results[job] = handle
+        if not self.send("done", job, (handle, generation)):
+            self.free()
+
+    def collect(self, job):
+        with self._lock:
+            self._results.pop(job, None)
+
+    def free(self):
+        with self._lock:
+            self._closed = True  # Results of running jobs are freed too
+            for handle in self._results.values():
+                _unlink(handle)
+            self._results.clear()
+
+    def close(self):
+        self.free()
+        self._client.close()
+
+
+class Client:
+    """Connection to a simulation server. Jobs run concurrently in the
+    server workers, their results can be requested in any order.
+
+    Parameters
+    ----------
+    address : str
+        Path of the server Unix socket.
+    authkey : bytes
+        Key of the server, see `Server.authkey`.
+    """
+
+    def __init__(self, address, authkey):
+        self._connection = connection.Client(address, "AF_UNIX", authkey)
+        self._jobs, self._done = 0, {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Closes the connection, results already returned by `result`
+        stay valid, the server frees the others."""
+        self._connection.close()
+
+    def add_rule(self, rule):
+        """Registers a rule table, the table is only sent if the server
+        does not have it yet.
+        :param rule: Rule table array
+        :return: Rule id to use in `submit`
+        """
+        rule_id = checkpoint.rule_digest(rule)
+        self._connection.send(("lookup", rule_id))
+        if self._receive("rule") is None:
+            self._connection.send(("rule", np.ascontiguousarray(rule)))
+            rule_id = self._receive("rule")
+        return rule_id
+
+    def submit(
+        self,
+        automaton_class,
+        rule_id,
+        configuration,
+        steps,
+        stride=1,
+        record=False,
+    ):
+        """Schedules a simulation in the server workers.
+        :param automaton_class: Automaton class or "module:qualname"
+        :param rule_id: Rule id returned by `add_rule`
+        :param configuration: Initial configuration array
+        :param steps: Number of generations to evolve, or to record
+        :param stride: Generations to advance between each record
+        :param record: If True, return all the recorded generations
+        :return: Job number to use in `result`
+        """
+        if isinstance(automaton_class, type):
+            module = automaton_class.__module__
+            automaton_class = f"{module}:{automaton_class.__qualname__}"
+        self._jobs += 1
+        task = automaton_class, rule_id, configuration, steps, stride, record
+        self._connection.send(("submit", self._jobs, *task))
+        return self._jobs
+
+    def result(self, job):
+        """Waits for a job and returns its result.
+        :param job: Job number returned by `submit`
+        :return: `Result` attached to the shared memory of the job
+        """
+        while job not in self._done:
+            self._receive(None)
+        error, value = self._done.pop(job)
+        if error:
+            raise value
+        result = Result(*value)
+        self._connection.send(("collect", job))
+        return result
+
+    def _receive(self, expected):
+        while True:
+            kind, *message = self._connection.recv()
+            if kind == "error" and message[0] is None:
+                raise message[1]  # Command errors, not of a job
+            if kind in ("done", "error"):
+                self._done[message[0]] = kind == "error", message[1]
+                if expected is None:
+                    return
+            elif kind == expected:
+                return message[0]
+
+
+def run(spec, rule, configuration, steps, stride=1, record=False):
+    """Evolves an automaton in a worker with a rule in shared memory.
+    :param spec: Automaton class as "module:qualname"
+    :param rule: Shared memory `Handle` of the rule table
+    :param configuration: Initial configuration array
+    :param steps: Number of generations to evolve, or to record
+    :param stride: Generations to advance between each record
+    :param record: If True, return all the recorded generations
+    :return: Tuple with the `Handle` of the result and the generation
+    """
+    module, _, name = spec.partition(":")
+    automaton_class = importlib.import_module(module)
+    for attribute in name.split("."):
+        automaton_class = getattr(automaton_class, attribute)
+    automaton = automaton_class(configuration, _attach(rule))
+    shape = (steps, *configuration.shape) if record else configuration.shape
+    handle = Handle(None, shape, np.dtype(configuration.dtype).str)
+    memory = shared_memory.SharedMemory(create=True, size=_size(handle))
+    handle = handle._replace(name=memory.name)
+    try:
+        if record:
+            automaton.evolve(steps, _view(memory, handle), stride)
+        else:
+            _view(memory, handle)[...] = automaton.evolve(steps * stride)
+    except BaseException:
+        memory.unlink()
+        raise
+    resource_tracker.unregister(memory._name, "shared_memory")  # Client
+    memory.close()
+    return handle, automaton.generation
+
+
+def _attach(handle):
+    if handle.name not in _segments:
+        memory = shared_memory.SharedMemory(handle.name)  # Server owned
+        array = _view(memory, handle)
+        array.setflags(write=False)  # Validated once per class and worker
+        _segments[handle.name] = memory, array
+    return _segments[handle.name][1]
+
+
+def _unlink(handle):
+    memory = shared_memory.SharedMemory(handle.name)
+    memory.close()
+    memory.unlink()
+
+
+def _view(memory, handle):
+    return np.ndarray(handle.shape, handle.dtype, buffer=memory.buf)
+
+
+def _size(handle):
+    size = int(np.prod(handle.shape)) * np.dtype(handle.dtype).itemsize
+    return max(size, 1)  # Segments cannot be empty
@@ -0,0 +1,102 @@
+"""Module with an active region engine for mostly quiescent automata.
+
+The configuration is divided into blocks and only the blocks next to a
+block that changed in the previous generation are evaluated. A cell
+whose neighbourhood did not change takes the same value it took in the
+previous generation, so the result is exact for any rule, including
+rules where the all-zero neighbourhood maps to a non zero state.
+"""
+import numpy as np
+from scipy.ndimage import correlate
+
+from ndautomata import BaseAutomaton, boundaries
+
+
+class SparseAutomaton(BaseAutomaton):
+    """Abstract class for automata evaluating only active blocks. The
+    first generation, and any generation where the fraction of active
+    blocks is above `threshold`, is evaluated densely.
+
+    Note in place modifications of `configuration` between generations
+    are not tracked, assign a new array to `configuration` instead.
+
+    Class Attributes
+    ----------------
+    block : PositiveInt
+        Length of the blocks sides in cells.
+    threshold : float
+        Fraction of active blocks above which dense evaluation is used.
+    """
+
+    block = 32
+    threshold = 0.5
+    _prior = _current = None  # Buffers of the last evaluated generation
+
+    def _transition(self, source, target):
+        active = self._active(source)
+        if active is None or active.mean() > self.threshold:
+            super()._transition(source, target)
+            self._changes = self._changed_blocks(source, target)
+        else:
+            if target is not self._prior:  # Stale target, copy quiescent
+                np.copyto(target, source)
+            self._changes = self._sparse_transition(source, target, active)
+        self._prior, self._current = source, target
+        return target
+
+    def reset(self, configuration, trusted=False):
+        super().reset(configuration, trusted)
+        self._prior = self._current = None  # Configuration changed in place
+
+    reset.__doc__ = BaseAutomaton.reset.__doc__
+
+    def _starts(self, source):
+        return [np.arange(0, n, self.block) for n in source.shape]
+
+    def _halo(self):
+        before = [dim // 2 for dim in self._weights.shape]
+        after = [x - y - 1 for x, y in zip(self._weights.shape, before)]
+        return before, after
+
+    def _active(self, source):
+        if self._current is not source:  # Unknown previous generation
+            return None
+        active, (before, after) = self._changes, self._halo()
+        for axis, starts in enumerate(self._starts(source)):
+            shortest = min(np.diff([*starts, source.shape[axis]]))
+            reach = -(-max(before[axis], after[axis]) // shortest)
+            dilated = active.copy()
+            for shift in range(1, reach + 1):  # Wrap, superset of others
+                dilated |= np.roll(active, shift, axis=axis)
+                dilated |= np.roll(active, -shift, axis=axis)
+            active = dilated
+        return active
+
+    def _changed_blocks(self, source, target):
+        changes = source != target
+        for axis, starts in enumerate(self._starts(source)):
+            changes = np.logical_or.reduceat(changes, starts, axis=axis)
+        return changes
+
+    def _sparse_transition(self, source, target, active):
+        changes = np.zeros_like(active)
+        before, after = self._halo()
+        for block in np.argwhere(active):
+            cells, rows = [], []
+            for axis, index in enumerate(block):
+                length = source.shape[axis]
+                start = index * self.block
+                stop = min(start + self.block, length)
+                cells.append(slice(start, stop))
+                halo = start - before[axis], stop + after[axis]
+                rows.append(np.arange(*halo))
+            region = boundaries.take(source, rows, self.boundary, self.cval)
+            indexes = np.empty(region.shape, dtype=self._dtype)
+            correlate(region, self._weights, mode="wrap", output=indexes)
+            inner = tuple(slice(x, x + y.stop - y.start) for x, y in
+                          zip(before, cells))
+            values = np.take(self._rule, indexes[inner], mode=self._mode)
+            cells = tuple(cells)
+            changes[tuple(block)] = np.any(values != source[cells])
+            target[cells] = values
+        return changes
@@ -0,0 +1,144 @@
+"""Module with tools to stream automaton evolutions to disk.
+
+A spacetime is a directory with a `meta.json` description and the
+generations stored either in a single memory mapped `frames.npy` file
+or in compressed `chunk-NNNNNN.npz` files of a fixed number of frames.
+Generations are written as they are evolved and read back lazily, so
+histories larger than the available memory can be recorded.
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+
+FORMAT, VERSION = "ndautomata.spacetime", 1
+
+
+def write(automaton, path, steps, stride=1, chunk=None, packbits=False):
+    """Evolves the automaton writing one generation every `stride`
+    generations into a spacetime directory.
+    :param automaton: Automaton instance to evolve in place
+    :param path: Directory where to write the spacetime
+    :param steps: Number of generations to write
+    :param stride: Generations to advance between each written frame
+    :param chunk: Frames per compressed chunk, None for a memory map
+    :param packbits: If True, pack binary cells into bits on disk
+    :return: Spacetime instance to read the written generations
+    """
+    if packbits and automaton.states != 2:
+        raise ValueError("Bit-packing requires an automaton with 2 states")
+    path, shape = Path(path), automaton.configuration.shape
+    path.mkdir(parents=True, exist_ok=True)
+    meta = dict(format=FORMAT, version=VERSION, shape=list(shape))
+    meta.update(dtype=str(automaton.configuration.dtype), frames=steps)
+    meta.update(stride=stride, chunk=chunk, packbits=packbits)
+    (path / "meta.json").write_text(json.dumps(meta))
+    stored = _stored_shape(shape, packbits)
+    if chunk is None and not packbits:  # Evolve directly into the file
+        frames = _open_frames(path, meta, "w+", [steps, *stored])
+        for start in range(0, steps, 64):  # Flush in batches of frames
+            count = min(64, steps - start)
+            automaton.evolve(count, frames[start:start + count], stride)
+            frames.flush()
+        return Spacetime(path)
+    size = chunk or 64  # Frames buffered before writing them
+    buffer = np.empty((size, *shape), dtype=automaton.configuration.dtype)
+    if chunk is None:
+        frames = _open_frames(path, meta, "w+", [steps, *stored])
+    for number, start in enumerate(range(0, steps, size)):
+        count = min(size, steps - start)
+        automaton.evolve(count, buffer[:count], stride)
+        data = _pack(buffer[:count]) if packbits else buffer[:count]
+        if chunk is None:
+            frames[start:][:count] = data
+            frames.flush()
+        else:
+            np.savez_compressed(path / f"chunk-{number:06d}.npz", frames=data)
+    return Spacetime(path)
+
+
+class Spacetime:
+    """Lazy reader of a spacetime directory created with `write`. Index
+    with `[generations, *window]`, only the frames requested are read.
+
+    Parameters
+    ----------
+    path : str or Path
+        Directory with the spacetime.
+
+    Attributes
+    ----------
+    shape : tuple
+        Shape of the whole spacetime, `(frames, *configuration.shape)`.
+    stride : PositiveInt
+        Generations between consecutive frames.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.meta = json.loads((self.path / "meta.json").read_text())
+        if self.meta["format"] != FORMAT or self.meta["version"] > VERSION:
+            raise ValueError(f"Unsupported spacetime format in {path}")
+        self.shape = (self.meta["frames"], *self.meta["shape"])
+        self.dtype = np.dtype(self.meta["dtype"])
+        self.stride = self.meta["stride"]
+        if self.meta["chunk"] is None:
+            self._frames = _open_frames(self.path, self.meta, "r")
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __array__(self, dtype=None):
+        return np.asarray(self[:], dtype=dtype)
+
+    def __getitem__(self, key):
+        generations, *window = key if isinstance(key, tuple) else (key,)
+        if self.meta["chunk"] is None:
+            data = self._frames[generations]
+        else:
+            data = self._read_chunks(generations)
+        if self.meta["packbits"]:
+            data = _unpack(data, self.shape[-1])
+        if not window:
+            return np.asarray(data)
+        frames = (slice(None),) * (np.ndim(data) - self.ndim)
+        return np.asarray(data)[frames + tuple(window)]
+
+    @property
+    def ndim(self):
+        return len(self.shape) - 1
+
+    def _read_chunks(self, generations):
+        indexes = np.arange(len(self))[generations]
+        chunk, frames = self.meta["chunk"], []
+        for number in np.unique(np.atleast_1d(indexes) // chunk):
+            file = self.path / f"chunk-{number:06d}.npz"
+            with np.load(file) as content:
+                data = content["frames"]
+            selected = np.atleast_1d(indexes)
+            selected = selected[selected // chunk == number] - number * chunk
+            frames.append(data[selected])
+        if not frames:
+            stored = _stored_shape(self.shape[1:], self.meta["packbits"])
+            return np.empty((0, *stored), dtype=self.dtype)
+        data = np.concatenate(frames)
+        return data[0] if np.ndim(indexes) == 0 else data
+
+
+def _stored_shape(shape, packbits):
+    return [*shape[:-1], -(-shape[-1] // 8)] if packbits else [*shape]
+
+
+def _open_frames(path, meta, mode, shape=None):
+    dtype = "uint8" if meta["packbits"] else meta["dtype"]
+    shape = None if shape is None else tuple(shape)
+    return np.lib.format.open_memmap(path / "frames.npy", mode, dtype, shape)
+
+
+def _pack(frames):
+    return np.packbits(frames, axis=-1, bitorder="little")
+
+
+def _unpack(frames, length):
+    frames = np.asarray(frames)
+    return np.unpackbits(frames, axis=-1, count=length, bitorder="little")
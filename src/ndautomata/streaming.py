@@ -0,0 +1,194 @@
+"""Module with tools to stream generations to live consumers.
+
+A background thread evolves the automaton writing each generation into
+a ring of preallocated frames and passes them through a bounded queue,
+so slow consumers apply backpressure, or lose the oldest frames when
+dropping is enabled, without blocking an event loop. Consumers receive
+read-only views of the ring, no copies are made.
+"""
+import asyncio
+import queue
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+Frame = namedtuple("Frame", ["generation", "configuration"])
+Frame.__doc__ = """Generation number and read-only configuration view,
+valid until the next frame is requested from the stream."""
+
+_END = object()  # Sentinel marking the end of the stream
+
+
+class Stream:
+    """Iterator and async iterator over the generations of an automaton
+    evolved in a background thread. The automaton must not be used by
+    other threads while the stream is running.
+
+    Parameters
+    ----------
+    automaton : BaseAutomaton
+        Automaton instance to evolve.
+    steps : PositiveInt, optional
+        Number of frames to produce, None for an endless stream.
+    stride : PositiveInt, optional
+        Generations to advance between frames, defaults to 1.
+    maxsize : PositiveInt, optional
+        Maximum number of frames waiting in the queue, defaults to 4.
+    drop : bool, optional
+        If True, drop the oldest waiting frame when the queue is full
+        instead of pausing the evolution. Defaults to False.
+    out : ndarray, optional
+        (maxsize + 2, *shape) array to use as frame ring, for example
+        backed by `multiprocessing.shared_memory`.
+
+    Attributes
+    ----------
+    dropped : int
+        Number of frames dropped because the queue was full.
+    """
+
+    def __init__(
+        self,
+        automaton,
+        steps=None,
+        stride=1,
+        maxsize=4,
+        drop=False,
+        out=None,
+    ):
+        shape = (maxsize + 2, *automaton.configuration.shape)
+        if out is not None and out.shape != shape:
+            raise ValueError(f"Frame ring shape does not fit {shape}")
+        if out is None:
+            out = np.empty(shape, dtype=automaton.configuration.dtype)
+        self.automaton, self.steps, self.stride = automaton, steps, stride
+        self.drop, self.dropped = drop, 0
+        self._ring, self._held, self._done = out, None, False
+        self._pending = None  # Frame requested by a cancelled __anext__
+        self._frames = queue.Queue(maxsize)  # Slots ready for consumers
+        self._free = queue.Queue()  # Slots the producer can write
+        for slot in range(len(out)):
+            self._free.put(slot)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        frame = self._next()
+        if frame is _END:
+            raise StopIteration
+        return frame
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        loop, pending = asyncio.get_running_loop(), self._pending
+        if pending is None or pending.get_loop() is not loop:
+            pending = loop.run_in_executor(None, self._next)
+            self._pending = pending
+        try:
+            frame = await asyncio.shield(pending)
+        finally:
+            if pending.done():  # Else the frame goes to the next call
+                self._pending = None
+        if frame is _END:
+            raise StopAsyncIteration
+        return frame
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Stops the evolution thread and discards the waiting frames,
+        consumers waiting for a frame reach the end of the stream."""
+        self._stop.set()
+        self._done = True
+        while self._thread.is_alive():
+            self._drain()
+            self._thread.join(0.01)
+        self._drain()
+
+    def _next(self):
+        item = None
+        while item is None:  # Wake up regularly to see if it was closed
+            if self._done:
+                return _END
+            try:
+                item = self._frames.get(timeout=0.05)
+            except queue.Empty:
+                continue
+        if self._held is not None:  # Previous frame view is released
+            self._free.put(self._held)
+            self._held = None
+        if item is _END or isinstance(item, BaseException):
+            self._done = True
+            if item is _END:
+                return _END
+            raise item
+        generation, slot = item
+        self._held = slot
+        view = self._ring[slot]
+        view.flags.writeable = False
+        return Frame(generation, view)
+
+    def _run(self):
+        try:
+            count = 0
+            while self.steps is None or count < self.steps:
+                slot = self._acquire()
+                if slot is None:
+                    return
+                target = self._ring[slot:][:1]
+                self.automaton.evolve(1, target, self.stride)
+                if not self._push((self.automaton.generation, slot)):
+                    return
+                count += 1
+        except Exception as error:
+            self._push(error)
+            return
+        self._push(_END)
+
+    def _acquire(self):
+        while not self._stop.is_set():
+            try:
+                return self._free.get(timeout=0.05)
+            except queue.Empty:
+                continue
+        return None
+
+    def _push(self, item):
+        drop = self.drop and isinstance(item, tuple)  # Never drop the end
+        while not self._stop.is_set():
+            try:
+                self._frames.put(item, block=not drop, timeout=0.05)
+                return True
+            except queue.Full:
+                if drop:
+                    self._discard()
+        return False
+
+    def _discard(self):
+        try:
+            oldest = self._frames.get_nowait()
+        except queue.Empty:
+            return
+        if isinstance(oldest, tuple):  # Frames only, keep end and errors
+            self._free.put(oldest[1])
+            self.dropped += 1
+
+    def _drain(self):
+        while True:
+            try:
+                item = self._frames.get_nowait()
+            except queue.Empty:
+                return
+            if isinstance(item, tuple):
+                self._free.put(item[1])
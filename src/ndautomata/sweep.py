@@ -0,0 +1,201 @@
+"""Module with tools to sweep the rule space of an automaton class.
+
+Rules are streamed in batches through a process pool with a bounded
+number of batches in flight, each run is evolved in place and measured
+on the fly, so memory stays flat regardless of the number of rules and
+the length of the runs. Results are columns with one value per rule:
+
+- "index": Position of the rule in the sweep.
+- "code": Rule number when rules are given as integers, else -1.
+- "lambda": Langton lambda, fraction of rule entries not quiescent.
+- "density": Mean fraction of cells not quiescent.
+- "entropy": Mean Shannon entropy of the cell states, in bits.
+- "activity": Mean fraction of cells changing between generations.
+- "damage": Fraction of cells differing at the end from a twin run
+  started with a single cell changed, damage spreading.
+"""
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import count, islice
+
+import numpy as np
+
+from ndautomata import initializers
+
+COLUMNS = ["index", "code", "lambda", "density", "entropy", "activity"]
+COLUMNS += ["damage"]
+
+
+def from_code(code, states, size):
+    """Returns the rule table of a rule number, where the digits of the
+    number in base `states` are the rule entries, lowest digit first.
+    For example rule 30 of elementary automata with `size=3`.
+    :param code: Non negative rule number
+    :param states: Number of possible cell states
+    :param size: Number of neighbours, dimensions of the rule
+    :return: Numpy uint8 array with shape `[states] * size`
+    """
+    entries = states**size
+    if not 0 <= code < states**entries:
+        raise ValueError(f"Rule code out of range [0, {states**entries})")
+    digits = np.empty(entries, dtype="uint8")
+    for position in range(entries):
+        code, digits[position] = divmod(code, states)
+    return digits.reshape([states] * size)
+
+
+def langton(rule, quiescent=0):
+    """Returns the Langton lambda parameter of a rule table.
+    :param rule: Rule table array
+    :param quiescent: Quiescent state, defaults to 0
+    :return: Fraction of rule entries not mapping to `quiescent`
+    """
+    return np.count_nonzero(rule != quiescent) / rule.size
+
+
+def entropy(configuration, states):
+    """Returns the Shannon entropy of the cell states of a configuration.
+    :param configuration: Automaton configuration array
+    :param states: Number of possible cell states
+    :return: Entropy in bits, between 0 and `log2(states)`
+    """
+    counts = np.bincount(configuration.ravel(), minlength=states)
+    frequencies = counts[counts > 0] / configuration.size
+    return float(-np.sum(frequencies * np.log2(frequencies)))
+
+
+def measure(automaton, steps, transient=0, twin=None):
+    """Evolves an automaton measuring its statistics without keeping
+    the generations, see the module documentation for the statistics.
+    :param automaton: Automaton instance to evolve in place
+    :param steps: Number of generations to measure
+    :param transient: Generations to evolve before measuring
+    :param twin: Optional perturbed automaton to measure the damage
+    :return: Dictionary with the "density", "entropy", "activity" and
+        "damage" statistics, damage is NaN without twin
+    """
+    automaton.evolve(transient)
+    previous = automaton.configuration.copy()
+    cells, states = previous.size, automaton.states
+    density = activity = information = 0.0
+    for _ in range(steps):
+        current = automaton.evolve(1)
+        density += np.count_nonzero(current) / cells
+        activity += np.count_nonzero(current != previous) / cells
+        information += entropy(current, states)
+        np.copyto(previous, current)
+    damage = np.nan
+    if twin is not None:
+        twin.evolve(transient + steps)
+        differ = twin.configuration != automaton.configuration
+        damage = np.count_nonzero(differ) / cells
+    steps = max(steps, 1)  # Zero statistics without steps
+    return {
+        "density": density / steps,
+        "entropy": information / steps,
+        "activity": activity / steps,
+        "damage": damage,
+    }
+
+
+def run(
+    automaton_class,
+    rules,
+    size,
+    steps,
+    initializer=initializers.random,
+    transient=0,
+    damage=True,
+    workers=None,
+    batch=16,
+    seed=0,
+    path=None,
+):
+    """Measures the evolution of an automaton class for each rule.
+    Runs are reproducible: the configuration of the run of the rule at
+    position `i` is created after seeding `numpy.random` with the
+    sequence `(seed, i)`, whatever the number of workers, the global
+    random state is restored after each run.
+    :param automaton_class: Picklable automaton class to sweep
+    :param rules: Iterable of rule tables or rule numbers, see `from_code`
+    :param size: Shape of the configurations
+    :param steps: Number of generations to measure in each run
+    :param initializer: Function from `initializers` to create the
+        initial configurations, defaults to `initializers.random`
+    :param transient: Generations to evolve before measuring
+    :param damage: If False, skip the twin runs and damage statistic
+    :param workers: Number of processes, defaults to all cores, with 1
+        runs are done in the calling process
+    :param batch: Number of rules sent to a process at once
+    :param seed: Seed of the initial configurations and perturbations
+    :param path: Optional `.npz` file to save the columns
+    :return: Dictionary of column name to array, sorted by "index"
+    """
+    workers = workers or os.cpu_count()
+    task = automaton_class, size, steps, initializer, transient, damage
+    batches = _batches(rules, batch)
+    if workers == 1:
+        results = [_runs(*task, seed, *items) for items in batches]
+    else:
+        results = _distribute(workers, task, seed, batches)
+    columns = {name: [] for name in COLUMNS}
+    for result in results:
+        for name in COLUMNS:
+            columns[name].append(result[name])
+    for name, parts in columns.items():
+        columns[name] = np.concatenate(parts) if parts else np.empty(0)
+    order = np.argsort(columns["index"], kind="stable")
+    columns = {name: column[order] for name, column in columns.items()}
+    if path is not None:
+        np.savez(path, **columns)
+    return columns
+
+
+def _batches(rules, batch):
+    iterator, positions = iter(rules), count()
+    while True:
+        items = list(islice(zip(positions, iterator), batch))
+        if not items:
+            return
+        yield [i for i, _ in items], [x for _, x in items]
+
+
+def _distribute(workers, task, seed, batches):
+    with ProcessPoolExecutor(workers) as pool:
+        pending, results = set(), []
+        for items in batches:
+            if len(pending) >= 2 * workers:  # Bound batches in flight
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                results.extend(job.result() for job in done)
+            pending.add(pool.submit(_runs, *task, seed, *items))
+        results.extend(job.result() for job in pending)
+    return results
+
+
+def _runs(cls, size, steps, initializer, transient, damage, seed, *items):
+    indexes, rules = items
+    columns = {name: np.empty(len(indexes)) for name in COLUMNS}
+    columns["index"] = np.array(indexes, dtype="int64")
+    columns["code"] = np.full(len(indexes), -1, dtype="int64")
+    for row, (index, rule) in enumerate(zip(indexes, rules)):
+        if isinstance(rule, (int, np.integer)):
+            columns["code"][row] = rule
+            rule = from_code(int(rule), cls.states, cls.neighbours.size)
+        rule = rule.reshape([cls.states] * cls.neighbours.size)
+        random = np.random.default_rng([seed, index])
+        state = np.random.get_state()  # Keep the caller random state
+        try:
+            np.random.seed(random.integers(2**32))  # Used by initializers
+            configuration = initializer(cls.states, size)
+        finally:
+            np.random.set_state(state)
+        automaton, twin = cls(configuration, rule), None
+        if damage:
+            cell = tuple(random.integers(size))
+            configuration[cell] = (configuration[cell] + 1) % cls.states
+            twin = cls(configuration, rule)
+        statistics = measure(automaton, steps, transient, twin)
+        statistics["lambda"] = langton(rule)
+        for name, value in statistics.items():
+            columns[name][row] = value
+    return columns
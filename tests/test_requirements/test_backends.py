@@ -0,0 +1,79 @@
+"""Module to test automaton evolution backends."""
+import numpy as np
+from ndautomata import BaseAutomaton, TotalisticAutomaton, backends
+from ndautomata import initializers, neighbours
+from pytest import importorskip, mark, raises, warns
+
+KERNELS = [
+    (BaseAutomaton, neighbours.regular(ndim=1, r=1)),
+    (BaseAutomaton, neighbours.regular(ndim=1, r=3)),
+    (BaseAutomaton, neighbours.regular(ndim=2, r=1)),
+    (BaseAutomaton, neighbours.hexagonal(ndim=2, r=1)),
+    (BaseAutomaton, neighbours.orthogonal([2, 5])),
+    (TotalisticAutomaton, neighbours.regular(ndim=2, r=2)),
+    (TotalisticAutomaton, neighbours.regular(ndim=3, r=1)),
+]
+
+
+def automaton_class(base, kernel, nstates):
+    class Automaton(base):
+        neighbours = kernel
+        states = nstates
+
+    return Automaton
+
+
+def random_rule(automaton_class):
+    if issubclass(automaton_class, TotalisticAutomaton):
+        size = [automaton_class.states, automaton_class.max_sum + 1]
+    else:
+        size = [automaton_class.states] * automaton_class.neighbours.size
+    return initializers.random(automaton_class.states, size)
+
+
+def test_unknown_backend():
+    with raises(ValueError):
+        backends.available("fortran")
+
+
+def test_fallback(monkeypatch):
+    monkeypatch.setattr(backends, "numba", None)
+    Automaton = automaton_class(BaseAutomaton, KERNELS[0][1], 2)
+    ic, rule = initializers.random(2, [10]), random_rule(Automaton)
+    with warns(UserWarning):
+        assert Automaton(ic, rule, backend="numba").backend == "scipy"
+
+
+@mark.parametrize("base, kernel", KERNELS)
+@mark.parametrize("nstates", [2, 3])
+def test_numba_matches_scipy(base, kernel, nstates):
+    importorskip("numba")
+    Automaton = automaton_class(base, kernel, nstates)
+    ic = initializers.random(nstates, [7, 6, 5][: kernel.ndim])
+    rule = random_rule(Automaton)
+    expected = Automaton(ic, rule, backend="scipy").evolve(4)
+    result = Automaton(ic, rule, backend="numba").evolve(4)
+    assert np.all(result == expected)
+
+
+def test_numba_class_attribute():
+    importorskip("numba")
+
+    class Automaton(BaseAutomaton):
+        neighbours = neighbours.regular(ndim=1, r=1)
+        states = 2
+        backend = "numba"
+
+    ic, rule = initializers.random(2, [10]), random_rule(Automaton)
+    assert Automaton(ic, rule).backend == "numba"
+
+
+@mark.parametrize("workers", [1, 2])
+def test_numba_rule_smaller_than_indexes(workers):
+    importorskip("numba")
+    Automaton = automaton_class(BaseAutomaton, KERNELS[0][1], 10)
+    ic = np.arange(10, dtype="uint8")
+    rule = initializers.random(states=2, size=[2] * 3)
+    ca = Automaton(ic, rule, backend="numba", workers=workers)
+    with raises(IndexError):
+        next(ca)
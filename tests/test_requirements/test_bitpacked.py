@@ -0,0 +1,79 @@
+"""Module to test bit-packed binary automata."""
+import numpy as np
+from ndautomata import BaseAutomaton, bitpacked, initializers, neighbours
+from pytest import mark, raises
+
+KERNELS = [
+    neighbours.regular(ndim=1, r=1),
+    neighbours.regular(ndim=1, r=2),
+    neighbours.regular(ndim=2, r=1),
+    neighbours.hexagonal(ndim=2, r=1),
+    neighbours.orthogonal([2, 3]),
+]
+
+
+def automaton_classes(kernel):
+    class Automaton(bitpacked.BitPackedAutomaton):
+        neighbours = kernel
+        states = 2
+
+    class Reference(BaseAutomaton):
+        neighbours = kernel
+        states = 2
+
+    return Automaton, Reference
+
+
+@mark.parametrize("shape", [[64], [3, 128], [2, 2, 64]])
+def test_pack_roundtrip(shape):
+    configuration = initializers.random(2, shape)
+    words = bitpacked.pack(configuration)
+    assert words.dtype == np.uint64
+    assert words.shape == (*shape[:-1], shape[-1] // 64)
+    assert np.all(bitpacked.unpack(words) == configuration)
+
+
+@mark.parametrize("offset", [[1], [-1], [63], [-65], [130]])
+def test_shift_1d(offset):
+    configuration = initializers.random(2, [192])
+    words = bitpacked.shift(bitpacked.pack(configuration), offset)
+    expected = np.roll(configuration, -offset[0])
+    assert np.all(bitpacked.unpack(words) == expected)
+
+
+def test_invalid_width():
+    Automaton, _ = automaton_classes(KERNELS[0])
+    with raises(ValueError):
+        Automaton(initializers.random(2, [100]), np.zeros([2] * 3))
+
+
+@mark.parametrize("rule", [0, 30, 90, 110, 184, 255])
+def test_elementary(rule):
+    Automaton, Reference = automaton_classes(KERNELS[0])
+    table = np.unpackbits(np.uint8(rule), bitorder="little")
+    table = table.reshape([2] * 3)
+    ic = initializers.random(2, [256])
+    ca, ref = Automaton(ic, table), Reference(ic, table)
+    assert np.all(ca.evolve(20) == ref.evolve(20))
+
+
+@mark.parametrize("kernel", KERNELS)
+@mark.parametrize("repeat", range(3))
+def test_matches_reference(kernel, repeat):
+    Automaton, Reference = automaton_classes(kernel)
+    rule = initializers.random(2, [2] * kernel.size)
+    ic = initializers.random(2, [5, 4, 128][3 - kernel.ndim:])
+    ca, ref = Automaton(ic, rule), Reference(ic, rule)
+    for _ in range(5):
+        assert np.all(next(ca) == next(ref))
+
+
+def test_evolve_out():
+    Automaton, Reference = automaton_classes(KERNELS[2])
+    rule = initializers.random(2, [2] * 9)
+    ic = initializers.random(2, [8, 64])
+    out = np.empty((3, 8, 64), dtype="uint8")
+    expected = np.empty_like(out)
+    Automaton(ic, rule).evolve(3, out=out, stride=2)
+    Reference(ic, rule).evolve(3, out=expected, stride=2)
+    assert np.all(out == expected)
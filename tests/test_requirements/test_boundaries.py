@@ -0,0 +1,120 @@
+"""Module to test the automaton boundary conditions."""
+from math import ceil, floor
+
+import numpy as np
+from ndautomata import BaseAutomaton, boundaries, initializers, neighbours
+from ndautomata.bitpacked import BitPackedAutomaton
+from ndautomata.sparse import SparseAutomaton
+from pytest import fixture, mark, raises
+
+PADS = {  # Equivalent numpy.pad modes
+    "wrap": dict(mode="wrap"),
+    "constant": dict(mode="constant", constant_values=2),
+    "reflect": dict(mode="symmetric"),
+    "open": dict(mode="edge"),
+}
+
+
+@fixture(params=list(boundaries.MODES))
+def automaton_class(request):
+    class Automaton(BaseAutomaton):
+        neighbours = neighbours.orthogonal([3, 4])
+        states = 3
+        boundary = request.param
+        cval = 2
+
+    return Automaton
+
+
+@fixture
+def configuration():
+    return initializers.random(states=3, size=[7, 9])
+
+
+@fixture
+def rule():
+    return initializers.random(states=3, size=[3] * 12)
+
+
+def reference(ca):
+    shape = ca.neighbours.shape
+    pads = [(floor(dim / 2), ceil(dim / 2)) for dim in shape]
+    array = np.pad(ca.configuration, pads, **PADS[ca.boundary])
+    windows = np.lib.stride_tricks.sliding_window_view(array, shape)
+    windows = windows[tuple(slice(0, n) for n in ca.configuration.shape)]
+    return windows.reshape(*ca.configuration.shape, -1)[..., ::-1]
+
+
+def test_cell_neighbours(automaton_class, configuration, rule):
+    ca = automaton_class(configuration, rule)
+    expected = reference(ca)
+    for index in np.ndindex(configuration.shape):
+        assert np.array_equal(ca.cell_neighbours(*index), expected[index])
+    indices = np.argwhere(np.ones(configuration.shape))
+    values = ca.cells_neighbours(indices)
+    assert np.array_equal(values, expected.reshape(values.shape))
+
+
+def test_evolve(automaton_class, configuration, rule):
+    ca = automaton_class(configuration, rule)
+    weights = ca.weights().ravel()[::-1].astype(int)
+    expected = rule.ravel()[reference(ca).astype(int) @ weights]
+    assert np.array_equal(next(ca), expected)
+
+
+@mark.parametrize("workers", [2, 3])
+def test_tiles(automaton_class, configuration, rule, workers):
+    expected = automaton_class(configuration, rule).evolve(5)
+    ca = automaton_class(configuration, rule, workers=workers)
+    assert np.array_equal(ca.evolve(5), expected)
+
+
+def test_sparse(automaton_class, rule):
+    class Sparse(SparseAutomaton, automaton_class):
+        block = 3
+
+    ic = initializers.zeros(states=3, size=[12, 15])
+    ic[0, :3] = ic[-1, -2:] = 1
+    rule = rule.copy()
+    rule.flat[0] = 0  # Quiescent neighbourhoods stay quiescent
+    expected = automaton_class(ic, rule).evolve(6)
+    assert np.array_equal(Sparse(ic, rule).evolve(6), expected)
+
+
+def test_numba_falls_back(automaton_class, configuration, rule):
+    expected = automaton_class(configuration, rule).evolve(3)
+    ca = automaton_class(configuration, rule, backend="numba")
+    assert np.array_equal(ca.evolve(3), expected)
+
+
+def test_invalid_boundary(configuration, rule):
+    class Automaton(BaseAutomaton):
+        neighbours = neighbours.orthogonal([3, 4])
+        states = 3
+        boundary = "spherical"
+
+    with raises(ValueError):
+        Automaton(configuration, rule)
+    Automaton.boundary, Automaton.cval = "constant", 3
+    with raises(ValueError):
+        Automaton(configuration, rule)
+
+
+def test_wrap_only_engines():
+    class BitPacked(BitPackedAutomaton):
+        neighbours = neighbours.regular(ndim=2, r=1)
+        states = 2
+        boundary = "open"
+
+    with raises(ValueError):
+        BitPacked(initializers.zeros(2, [4, 64]), np.zeros([2] * 9, "uint8"))
+
+
+@mark.parametrize("boundary", list(boundaries.MODES))
+def test_pad(boundary):
+    array = np.random.randint(3, size=[3, 4], dtype="uint8")
+    halo = [(2, 1), (5, 0)]
+    expected = np.pad(array, halo, **PADS[boundary])
+    out = np.empty(expected.shape, "uint8")
+    assert boundaries.pad(array, halo, boundary, 2, out) is out
+    assert np.array_equal(out, expected)
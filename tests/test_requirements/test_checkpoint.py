@@ -0,0 +1,103 @@
+"""Module to test automata checkpoint and restore."""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from ndautomata import BaseAutomaton, TotalisticAutomaton, checkpoint
+from ndautomata import initializers, neighbours
+from ndautomata.hashlife import HashlifeAutomaton
+from pytest import mark, raises
+
+
+class Automaton(BaseAutomaton):
+    neighbours = neighbours.regular(ndim=2, r=1)
+    states = 2
+
+
+class Totalistic(TotalisticAutomaton):
+    neighbours = neighbours.regular(ndim=2, r=1)
+    states = 3
+
+
+class Hashlife(HashlifeAutomaton):
+    pass
+
+
+@mark.parametrize(
+    "automaton_class, rule_size",
+    [
+        (Automaton, [2] * 9),
+        (Totalistic, [3, Totalistic.max_sum + 1]),
+        (Hashlife, [2] * 9),
+    ],
+)
+def test_resume(tmp_path, automaton_class, rule_size):
+    states = automaton_class.states
+    rule = initializers.random(states, rule_size)
+    ca = automaton_class(initializers.random(states, [16, 16]), rule)
+    ca.evolve(5)
+    checkpoint.save(ca, tmp_path / "gen-5")
+    restored = checkpoint.load(automaton_class, tmp_path / "gen-5")
+    assert restored.generation == ca.generation == 5
+    assert np.array_equal(restored.rule, ca.rule)
+    assert np.array_equal(restored.evolve(7), ca.evolve(7))
+    assert restored.generation == 12
+
+
+def test_rules_deduplicated(tmp_path):
+    rule = initializers.random(2, [2] * 9)
+    ca = Automaton(initializers.random(2, [10, 10]), rule)
+    for name in ["a", "b", "c"]:
+        checkpoint.save(ca, tmp_path / name)
+        ca.evolve(1)
+    assert len(list((tmp_path / "rules").iterdir())) == 1
+    ca.rule = initializers.random(2, [2] * 9)
+    checkpoint.save(ca, tmp_path / "d")
+    assert len(list((tmp_path / "rules").iterdir())) == 2
+    restored = checkpoint.load(Automaton, tmp_path / "b")
+    assert restored.generation == 1
+    assert np.array_equal(restored.rule, rule)
+
+
+def test_concurrent_saves(tmp_path, monkeypatch):
+    rule = initializers.random(2, [2] * 9)
+    ca = Automaton(initializers.random(2, [8, 8]), rule)
+    barrier, replace = threading.Barrier(2, timeout=5), os.replace
+
+    def rename(source, target):  # Both rule writes are done first
+        if Path(target).parent.name == "rules":
+            barrier.wait()
+        replace(source, target)
+
+    monkeypatch.setattr(os, "replace", rename)
+    with ThreadPoolExecutor(2) as pool:
+        paths = [tmp_path / "a", tmp_path / "b"]
+        list(pool.map(lambda x: checkpoint.save(ca, x), paths))
+    assert len(list((tmp_path / "rules").iterdir())) == 1
+    restored = checkpoint.load(Automaton, tmp_path / "b")
+    assert np.array_equal(restored.rule, rule)
+
+
+def test_rule_mmap(tmp_path):
+    rule = initializers.random(2, [2] * 9)
+    ca = Automaton(initializers.random(2, [8, 8]), rule)
+    checkpoint.save(ca, tmp_path / "snapshot")
+    restored = checkpoint.load(Automaton, tmp_path / "snapshot")
+    assert isinstance(restored.rule.base, np.memmap)
+    assert not restored.rule.flags.writeable
+    restored = checkpoint.load(Automaton, tmp_path / "snapshot", mmap=False)
+    assert not isinstance(restored.rule.base, np.memmap)
+
+
+def test_class_mismatch(tmp_path):
+    class Other(BaseAutomaton):
+        neighbours = neighbours.hexagonal(ndim=2, r=1)
+        states = 2
+
+    rule = initializers.random(2, [2] * 9)
+    ca = Automaton(initializers.random(2, [8, 8]), rule)
+    checkpoint.save(ca, tmp_path / "snapshot")
+    with raises(ValueError):
+        checkpoint.load(Other, tmp_path / "snapshot")
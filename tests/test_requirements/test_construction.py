@@ -0,0 +1,142 @@
+"""Module to test the fast construction and reset of automata."""
+import gc
+import weakref
+
+import numpy as np
+from ndautomata import BaseAutomaton, TotalisticAutomaton, initializers
+from ndautomata import neighbours
+from ndautomata.bitpacked import BitPackedAutomaton
+from ndautomata.sparse import SparseAutomaton
+from pytest import fixture, mark, raises
+
+
+class Automaton(BaseAutomaton):
+    neighbours = neighbours.regular(ndim=2, r=1)
+    states = 3
+
+
+class Sparse(SparseAutomaton, Automaton):
+    block = 4
+
+
+class BitPacked(BitPackedAutomaton):
+    neighbours = neighbours.regular(ndim=2, r=1)
+    states = 2
+
+
+@fixture
+def rule():
+    return initializers.random(states=3, size=[3] * 9)
+
+
+def test_kernel_cached(rule):
+    ic = initializers.random(states=3, size=[8, 8])
+    first, second = Automaton(ic, rule), Automaton(ic, rule)
+    assert first._weights is second._weights
+    assert not first._weights.flags.writeable
+
+    class Other(Automaton):
+        states = 2
+
+    other = Other(initializers.zeros(2, [8, 8]), np.zeros([2] * 9, "uint8"))
+    assert other._weights is not first._weights
+    assert np.array_equal(other._weights, Other.weights())
+
+
+def test_rule_validated_once(rule, monkeypatch):
+    ic = initializers.random(states=3, size=[8, 8])
+    rule.setflags(write=False)
+    Automaton(ic, rule)
+    calls = []
+    monkeypatch.setattr(np, "max", lambda x: calls.append(x) or x.max())
+    Automaton(ic, rule)
+    assert len(calls) == 1  # Only the configuration is checked
+    writable = rule.copy()
+    Automaton(ic, writable)
+    Automaton(ic, writable)
+    assert len(calls) == 5
+
+
+def test_invalid_read_only_rule():
+    ic = initializers.random(states=3, size=[8, 8])
+    rule = np.full([3] * 9, 3, dtype="uint8")
+    rule.setflags(write=False)
+    for _ in range(2):
+        with raises(ValueError):
+            Automaton(ic, rule)
+
+
+def test_mutable_rules_validated(rule):
+    ic = initializers.random(states=3, size=[8, 8])
+    view = rule[...]  # Read-only view of a writable rule
+    view.setflags(write=False)
+    Automaton(ic, view)
+    rule[0, 0, 0, 0, 0, 0, 0, 0, 0] = 3
+    with raises(ValueError):
+        Automaton(ic, view)
+    copy = rule % 3
+    copy.setflags(write=False)
+    Automaton(ic, copy)
+    copy.setflags(write=True)  # Writable again, validated again
+    copy[0, 0, 0, 0, 0, 0, 0, 0, 0] = 3
+    with raises(ValueError):
+        Automaton(ic, copy)
+
+
+def test_classes_not_kept_alive(rule):
+    class Temporary(Automaton):
+        pass
+
+    rule.setflags(write=False)
+    Temporary(initializers.random(states=3, size=[8, 8]), rule)
+    reference = weakref.ref(Temporary)
+    del Temporary
+    gc.collect()
+    assert reference() is None
+
+
+def test_trusted_zero_copy(rule, monkeypatch):
+    ic = initializers.random(states=3, size=[8, 8])
+    monkeypatch.setattr(np, "max", lambda x: None)  # Fails if called
+    ca = Automaton(ic, rule, trusted=True)
+    assert ca.configuration is ic
+    totalistic = type("T", (TotalisticAutomaton, Automaton), {})
+    table = np.zeros((3, totalistic.max_sum + 1), dtype="uint8")
+    assert totalistic(ic, table, trusted=True).configuration is ic
+    with raises(ValueError):  # Shapes are still checked
+        Automaton(ic[0], rule, trusted=True)
+
+
+def test_trusted_buffer_stays_live(rule):
+    ic = initializers.random(states=3, size=[8, 8])
+    expected = Automaton(ic, rule).evolve(3)
+    ca = Automaton(ic, rule, trusted=True)
+    for steps in [1, 2]:  # Odd and even numbers of buffer swaps
+        ca.evolve(steps)
+        assert ca.configuration is ic
+    assert np.array_equal(ic, expected)
+
+
+@mark.parametrize("automaton_class", [Automaton, Sparse])
+def test_reset(automaton_class, rule):
+    ic = initializers.random(states=3, size=[16, 16])
+    ca = automaton_class(initializers.random(states=3, size=[16, 16]), rule)
+    ca.evolve(3)
+    buffer = ca.configuration
+    ca.reset(ic)
+    assert ca.configuration is buffer and ca.generation == 0
+    assert np.array_equal(ca.evolve(4), Automaton(ic, rule).evolve(4))
+    with raises(ValueError):
+        ca.reset(ic[:8])
+    with raises(ValueError):
+        ca.reset(np.full_like(ic, 3))
+
+
+def test_reset_bitpacked():
+    rule = initializers.random(states=2, size=[2] * 9)
+    ic = initializers.random(states=2, size=[8, 64])
+    ca = BitPacked(initializers.random(states=2, size=[8, 64]), rule)
+    ca.evolve(2)
+    ca.reset(ic)
+    assert ca.generation == 0
+    assert np.array_equal(ca.evolve(3), BitPacked(ic, rule).evolve(3))
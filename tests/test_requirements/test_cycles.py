@@ -0,0 +1,53 @@
+"""Module to test cycle and fixed point detection."""
+import numpy as np
+from ndautomata import BaseAutomaton, cycles, initializers, neighbours
+from pytest import mark
+
+
+class Elementary(BaseAutomaton):
+    neighbours = neighbours.regular(ndim=1, r=1)
+    states = 2
+
+
+def elementary(number):
+    table = np.unpackbits(np.uint8(number), bitorder="little")
+    return table.reshape([2] * 3)
+
+
+def test_digest():
+    array = initializers.random(2, [4, 6])
+    assert cycles.digest(array) == cycles.digest(array.copy())
+    assert cycles.digest(array) != cycles.digest(array.reshape(6, 4))
+    assert cycles.digest(array.T) == cycles.digest(array.T.copy())
+
+
+def test_fixed_point():
+    ca = Elementary(initializers.random(2, [32]), elementary(0))
+    cycle = cycles.run(ca, 1000)
+    assert cycle == cycles.Cycle(transient=1, period=1)
+    assert np.all(ca.configuration == 0)
+
+
+def test_shift_period():
+    ic = initializers.center(2, [16])
+    ca = Elementary(ic, elementary(170))  # Shifts one cell left
+    assert cycles.run(ca, 1003) == cycles.Cycle(transient=0, period=16)
+    assert np.all(ca.configuration == np.roll(ic, -1003))
+    assert ca.generation == 1003
+
+
+@mark.parametrize("number", [30, 54, 90, 110, 184])
+@mark.parametrize("steps", [50, 333])
+def test_jump_matches_evolve(number, steps):
+    ic = initializers.random(2, [12])
+    rule = elementary(number)
+    ca, ref = Elementary(ic, rule), Elementary(ic, rule)
+    cycles.run(ca, steps)
+    assert np.all(ca.configuration == ref.evolve(steps))
+
+
+def test_bounded_history():
+    detector = cycles.CycleDetector(history=4)
+    ca = Elementary(initializers.center(2, [16]), elementary(170))
+    assert cycles.run(ca, 100, detector) is None
+    assert len(detector._seen) == 4
@@ -0,0 +1,95 @@
+"""Module to test the batched evolution of automata ensembles."""
+import numpy as np
+from ndautomata import BaseAutomaton, backends, initializers, neighbours
+from ndautomata.ensemble import EnsembleAutomaton
+from pytest import fixture, mark, raises
+
+
+@fixture(scope="module", params=[1, 2])
+def ndim(request):
+    return request.param
+
+
+@fixture(scope="module")
+def classes(ndim):
+    class Automaton(BaseAutomaton):
+        neighbours = neighbours.regular(ndim, r=1)
+        states = 2
+
+    class Ensemble(EnsembleAutomaton, Automaton):
+        pass
+
+    return Automaton, Ensemble
+
+
+@fixture(scope="module")
+def ics(ndim):
+    return initializers.random(2, [6] + [9] * ndim)
+
+
+def members(classes, ics, rules):
+    Automaton, _ = classes
+    return [Automaton(ic, rule).evolve(4) for ic, rule in zip(ics, rules)]
+
+
+@mark.parametrize("backend", backends.BACKENDS)
+@mark.parametrize("workers", [1, 4])
+def test_shared_rule(classes, ics, backend, workers):
+    _, Ensemble = classes
+    rule = initializers.random(2, [2] * Ensemble.neighbours.size)
+    ensemble = Ensemble(ics, rule, backend=backend, workers=workers)
+    assert ensemble.batch == 6
+    expected = members(classes, ics, [rule] * 6)
+    assert np.all(ensemble.evolve(4) == expected)
+
+
+@mark.parametrize("flat", [False, True])
+@mark.parametrize("workers", [1, 4])
+def test_stacked_rules(classes, ics, flat, workers):
+    _, Ensemble = classes
+    size = [6] + [2] * Ensemble.neighbours.size
+    rules = initializers.random(2, size)
+    stacked = rules.reshape(6, -1) if flat else rules
+    ensemble = Ensemble(ics, stacked, workers=workers)
+    assert ensemble.rule.shape == rules.shape
+    expected = members(classes, ics, rules)
+    assert np.all(ensemble.evolve(4) == expected)
+
+
+@mark.parametrize("flat", [False, True])
+def test_single_member(classes, ics, flat):
+    _, Ensemble = classes
+    rules = initializers.random(2, [1] + [2] * Ensemble.neighbours.size)
+    stacked = rules.reshape(1, -1) if flat else rules
+    ensemble = Ensemble(ics[:1], stacked)
+    assert ensemble.rule.shape == rules.shape
+    assert np.all(ensemble.evolve(4) == members(classes, ics[:1], rules))
+
+
+def test_stacked_rules_batch(classes, ics):
+    _, Ensemble = classes
+    rules = initializers.random(2, [5] + [2] * Ensemble.neighbours.size)
+    with raises(ValueError):
+        Ensemble(ics, rules)
+
+
+def test_invalid_dimensions(classes, ics):
+    _, Ensemble = classes
+    rule = initializers.random(2, [2] * Ensemble.neighbours.size)
+    with raises(ValueError):
+        Ensemble(ics[0], rule)
+
+
+def test_elementary_rule_space():
+    class Ensemble(EnsembleAutomaton):
+        neighbours = neighbours.regular(ndim=1, r=1)
+        states = 2
+
+    numbers = np.arange(256, dtype="uint8")[:, None]
+    rules = np.unpackbits(numbers, axis=1, bitorder="little")
+    ics = initializers.random(2, [256, 64])
+    ensemble = Ensemble(ics, rules)
+    assert ensemble.neighbour_indexes().dtype == "uint16"
+    final = ensemble.evolve(10)
+    assert np.all(final[0] == 0) and np.all(final[255] == 1)
+    assert np.all(final[204] == ics[204])  # Identity rule
@@ -0,0 +1,66 @@
+"""Module to test multi-step automaton evolution."""
+import copy
+
+import numpy as np
+from ndautomata import initializers
+from pytest import fixture, mark, raises
+
+
+# Module fixtures ---------------------------------------------------
+@fixture(scope="function")
+def automaton(automaton_class, shape, rule, nstates):
+    ic = initializers.random(nstates, shape)
+    return automaton_class(ic, rule)
+
+
+@fixture(scope="function")
+def reference(automaton):
+    return copy.deepcopy(automaton)
+
+
+# Requirements ------------------------------------------------------
+@mark.parametrize("steps", [0, 1, 4])
+@mark.parametrize("stride", [1, 3])
+def test_evolve_out(automaton, reference, steps, stride):
+    out = np.empty((steps, *automaton.configuration.shape), dtype="uint8")
+    assert automaton.evolve(steps, out=out, stride=stride) is out
+    for frame in out:
+        for _ in range(stride):
+            expected = next(reference)
+        assert np.all(frame == expected)
+    assert np.all(automaton.configuration == reference.configuration)
+
+
+@mark.parametrize("steps", [1, 2, 5])
+def test_evolve_discards(automaton, reference, steps):
+    final = automaton.evolve(steps)
+    for _ in range(steps):
+        next(reference)
+    assert final is automaton.configuration
+    assert np.all(final == reference.configuration)
+
+
+def test_evolve_continues(automaton, reference):
+    automaton.evolve(3)
+    automaton.evolve(2, stride=2)
+    for _ in range(7):
+        next(reference)
+    assert np.all(next(automaton) == next(reference))
+
+
+def test_evolve_shape(automaton):
+    with raises(ValueError):
+        automaton.evolve(2, out=np.empty((3, *automaton.configuration.shape)))
+
+
+@mark.parametrize("dtype", ["int64", "int32", "uint16"])
+def test_evolve_dtypes(automaton, reference, dtype):
+    configuration = automaton.configuration.astype(dtype)
+    ca = type(automaton)(configuration, automaton.rule)  # uint8 rule
+    assert np.all(next(ca) == next(reference))
+    assert ca.configuration.dtype == dtype
+    out = np.empty((2, *configuration.shape), dtype=dtype)
+    expected = np.empty_like(out)  # Wider than the uint8 configuration
+    ca.evolve(2, out=out)
+    reference.evolve(2, out=expected)
+    assert np.all(out == expected)
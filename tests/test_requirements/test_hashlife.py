@@ -0,0 +1,69 @@
+"""Module to test the Hashlife engine for 2D binary automata."""
+import numpy as np
+from ndautomata import BaseAutomaton, hashlife, initializers, neighbours
+from pytest import mark, raises
+
+
+def life_rule():
+    digits = np.indices([2] * 9).reshape(9, -1)
+    total = digits.sum(axis=0) - digits[4]
+    rule = np.where(digits[4] == 1, (total == 2) | (total == 3), total == 3)
+    return rule.astype("uint8").reshape([2] * 9)
+
+
+class Reference(BaseAutomaton):
+    neighbours = neighbours.regular(ndim=2, r=1)
+    states = 2
+
+
+@mark.parametrize("side", [1, 2, 8, 32])
+def test_quadtree_roundtrip(side):
+    array = initializers.random(2, [side, side])
+    assert np.all(hashlife.to_array(hashlife.from_array(array)) == array)
+
+
+def test_canonical_nodes():
+    array = np.zeros((16, 16), dtype="uint8")
+    root = hashlife.from_array(array)
+    assert root.a is root.b is root.c is root.d
+    assert hashlife.from_array(array) is root
+
+
+def test_invalid_shape():
+    with raises(ValueError):
+        hashlife.HashlifeAutomaton(np.zeros((6, 6), "uint8"), life_rule())
+
+
+@mark.parametrize("side", [4, 8, 32])
+@mark.parametrize("rule", [life_rule, lambda: initializers.random(2, [2] * 9)])
+def test_next_matches_reference(side, rule):
+    rule, ic = rule(), initializers.random(2, [side, side])
+    ca, ref = hashlife.HashlifeAutomaton(ic, rule), Reference(ic, rule)
+    for _ in range(6):
+        assert np.all(next(ca) == next(ref))
+
+
+@mark.parametrize("k", [0, 2, 3, 5])
+def test_jump_matches_reference(k):
+    rule, ic = life_rule(), initializers.random(2, [16, 16])
+    ca, ref = hashlife.HashlifeAutomaton(ic, rule), Reference(ic, rule)
+    ca.jump(k)
+    assert np.all(ca.configuration == ref.evolve(2**k))
+
+
+def test_evolve_stride():
+    rule, ic = initializers.random(2, [2] * 9), initializers.random(2, [8, 8])
+    ca, ref = hashlife.HashlifeAutomaton(ic, rule), Reference(ic, rule)
+    out, expected = np.empty((3, 8, 8), "uint8"), np.empty((3, 8, 8), "uint8")
+    ca.evolve(3, out=out, stride=5)
+    ref.evolve(3, out=expected, stride=5)
+    assert np.all(out == expected)
+
+
+def test_cache_limit():
+    rule, ic = life_rule(), initializers.random(2, [32, 32])
+    ca = hashlife.HashlifeAutomaton(ic, rule, max_cache=50)
+    ref = Reference(ic, rule)
+    ca.jump(4)
+    assert len(ca._cache) <= 50
+    assert np.all(ca.configuration == ref.evolve(16))
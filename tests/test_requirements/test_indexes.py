@@ -0,0 +1,95 @@
+"""Module to test the rule index dtype selection."""
+import numpy as np
+from ndautomata import BaseAutomaton, TotalisticAutomaton, rules
+from ndautomata import indexing, initializers, neighbours
+from pytest import mark, raises
+
+
+def automaton_class(kernel, nstates, base=BaseAutomaton):
+    class Automaton(base):
+        neighbours = kernel
+        states = nstates
+
+    return Automaton
+
+
+@mark.parametrize("kernel, nstates, dtype", [
+    (neighbours.regular(ndim=1, r=1), 2, "uint8"),
+    (neighbours.regular(ndim=2, r=1), 2, "uint16"),
+    (neighbours.regular(ndim=2, r=1), 3, "uint16"),
+    (neighbours.regular(ndim=3, r=1), 2, "uint32"),
+    (neighbours.regular(ndim=2, r=2), 3, "int64"),
+])
+def test_index_dtype(kernel, nstates, dtype):
+    assert automaton_class(kernel, nstates).index_dtype == dtype
+
+
+def test_totalistic_dtype():
+    kernel = neighbours.regular(ndim=3, r=2)
+    Automaton = automaton_class(kernel, 4, TotalisticAutomaton)
+    assert Automaton.index_dtype == "uint16"
+
+
+@mark.parametrize("kernel, nstates", [
+    (neighbours.regular(ndim=2, r=3), 3),
+    (neighbours.regular(ndim=3, r=2), 2),
+])
+def test_index_overflow(kernel, nstates):
+    with raises(ValueError):
+        automaton_class(kernel, nstates).index_dtype
+
+
+def test_index_buffer():
+    Automaton = automaton_class(neighbours.regular(ndim=1, r=1), 2)
+    ic, rule = initializers.random(2, [20]), initializers.random(2, [2] * 3)
+    indexes = Automaton(ic, rule).neighbour_indexes()
+    assert indexes.dtype == "uint8"
+    assert indexes.max() < 8
+
+
+def test_rule_smaller_than_indexes():
+    Automaton = automaton_class(neighbours.regular(ndim=1, r=1), 10)
+    ic = np.array([0, 1, 2, 3, 4, 5, 6, 7, 8, 9], dtype="uint8")
+    ca = Automaton(ic, initializers.random(states=2, size=[2] * 3))
+    with raises(IndexError):
+        next(ca)
+
+
+def test_max_index_constant():
+    weights = np.array([2**52, 2**52])
+    with raises(ValueError):
+        rules.index_dtype(weights, 2)
+
+
+@mark.parametrize("kernel", [
+    neighbours.regular(ndim=2, r=1),
+    neighbours.hexagonal(ndim=2, r=1),
+    neighbours.von_neumann(ndim=3, r=1),
+])
+@mark.parametrize("options", [{}, {"workers": 3}, {"compact": True}])
+@mark.parametrize("dtypes", [
+    ("uint8", "uint8"),
+    ("int64", "uint8"),
+    ("int64", "int64"),
+])
+def test_indexing_strategies(kernel, options, dtypes):
+    rule = initializers.random(2, [2] * kernel.size)
+    ic = initializers.random(2, [9] * kernel.ndim)
+    workers = options.get("workers", 1)
+    expected = automaton_class(kernel, 2)(ic, rule).evolve(4)
+    ic, rule = ic.astype(dtypes[0]), rule.astype(dtypes[1])
+    for strategy in ["dense", "shifted", "separable", "auto"]:
+        if strategy == "separable" and indexing.factors(kernel) is None:
+            continue
+        Automaton = automaton_class(kernel, 2)
+        Automaton.indexing = strategy
+        Automaton.compact = options.get("compact", False)
+        ca = Automaton(ic, rule, workers=workers)
+        assert np.array_equal(ca.evolve(4), expected)
+
+
+def test_unknown_indexing():
+    Automaton = automaton_class(neighbours.regular(ndim=1, r=1), 2)
+    Automaton.indexing = "fourier"
+    with raises(ValueError):
+        Automaton(initializers.random(2, [20]), np.zeros([2] * 3, "uint8"))
@@ -0,0 +1,85 @@
+"""Module to test automata with rules evaluated on demand."""
+import numpy as np
+from ndautomata import BaseAutomaton, initializers, neighbours
+from ndautomata.lookup import LookupAutomaton
+from pytest import mark, raises
+
+
+class Automaton(BaseAutomaton):
+    neighbours = neighbours.regular(ndim=2, r=1)
+    states = 3
+
+
+class Lookup(LookupAutomaton, Automaton):
+    pass
+
+
+def life(x):
+    return (x.sum == 3) | (x.centre == 1) & (x.sum == 2)
+
+
+@mark.parametrize("workers", [1, 2])
+@mark.parametrize("kind", ["callable", "mapping"])
+def test_matches_table(kind, workers):
+    table = initializers.random(states=3, size=[3] * 9)
+    if kind == "mapping":
+        rule = {i: x for i, x in enumerate(table.ravel()) if x}
+    else:
+        rule = lambda x: table.ravel()[x.indexes]  # noqa: E731
+    ic = initializers.random(states=3, size=[20, 24])
+    expected = Automaton(ic, table).evolve(10)
+    ca = Lookup(ic, rule, workers=workers)
+    assert ca.rule is rule
+    assert np.array_equal(ca.evolve(10), expected)
+
+
+def test_memo():
+    class Large(LookupAutomaton):
+        neighbours = neighbours.regular(ndim=2, r=3)
+        states = 2
+        max_memo = 100
+
+    calls = []
+
+    def rule(x):
+        calls.append(x.indexes.size)
+        return life(x)
+
+    ca = Large(initializers.zeros(states=2, size=[32, 32]), rule)
+    ca.evolve(5)  # All the generations have the same single index
+    assert calls == [1] and ca.misses == 1 and ca.hits == 4
+    ca.configuration = initializers.random(states=2, size=[32, 32])
+    ca.evolve(3)
+    assert ca._keys.size == 100 and np.all(np.diff(ca._keys) > 0)
+
+
+def test_large_radius_life():
+    class Large(LookupAutomaton):
+        neighbours = neighbours.regular(ndim=2, r=2)
+        states = 2
+
+    class Life(BaseAutomaton):
+        neighbours = neighbours.regular(ndim=2, r=1)
+        states = 2
+
+    digits = np.indices([2] * 9).reshape(9, -1)
+    total = digits.sum(axis=0) - digits[4]
+    table = np.where(digits[4] == 1, (total == 2) | (total == 3), total == 3)
+    inner = np.zeros([5, 5], dtype=bool)
+    inner[1:4, 1:4] = True
+
+    def rule(x):  # Life on the inner 3x3 of a 5x5 neighbourhood
+        cells = x.cells[:, inner].reshape(-1, 9)
+        return table[cells[:, ::-1] @ (2 ** np.arange(9))]
+
+    ic = initializers.random(states=2, size=[30, 30])
+    expected = Life(ic, table.reshape([2] * 9).astype("uint8")).evolve(8)
+    assert np.array_equal(Large(ic, rule).evolve(8), expected)
+
+
+def test_invalid_rule():
+    ic = initializers.random(states=3, size=[8, 8])
+    with raises(TypeError):
+        Lookup(ic, np.zeros([3] * 9, dtype="uint8"))
+    with raises(ValueError):
+        Lookup(ic, lambda x: x.sum).evolve(1)
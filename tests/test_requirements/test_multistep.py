@@ -0,0 +1,109 @@
+"""Module to test the multi-step block table engine for 1D automata."""
+import numpy as np
+from ndautomata import BaseAutomaton, initializers, multistep, neighbours
+from ndautomata.multistep import MultiStepAutomaton
+from pytest import fixture, mark, raises
+
+KERNELS = [
+    (neighbours.regular(ndim=1, r=1), 2),
+    (neighbours.regular(ndim=1, r=2), 2),
+    (neighbours.orthogonal([4]), 2),
+    (neighbours.regular(ndim=1, r=1), 3),
+]
+
+
+@fixture(params=KERNELS)
+def automaton_classes(request):
+    class Automaton(BaseAutomaton):
+        neighbours, states = request.param
+
+    class MultiStep(MultiStepAutomaton, Automaton):
+        pass
+
+    return Automaton, MultiStep
+
+
+@fixture
+def configuration(automaton_classes):
+    return initializers.random(automaton_classes[0].states, size=[257])
+
+
+@fixture
+def rule(automaton_classes):
+    automaton = automaton_classes[0]
+    size = [automaton.states] * automaton.neighbours.size
+    return initializers.random(automaton.states, size=size)
+
+
+@mark.parametrize("steps, stride", [(30, 1), (4, 7), (3, 40)])
+def test_evolve(automaton_classes, configuration, rule, steps, stride):
+    automaton, multi_step = automaton_classes
+    out = np.empty((steps, *configuration.shape), "uint8")
+    expected = automaton(configuration, rule).evolve(steps, out.copy(), stride)
+    ca = multi_step(configuration, rule)
+    assert ca.steps > 1
+    assert np.array_equal(ca.evolve(steps, out, stride), expected)
+    expected = automaton(expected[-1], rule).evolve(steps * stride)
+    assert np.array_equal(ca.evolve(steps * stride), expected)
+    assert ca.generation == 2 * steps * stride
+
+
+def test_table_cached(automaton_classes, configuration, rule):
+    _, multi_step = automaton_classes
+    first = multi_step(configuration, rule)
+    second = multi_step(configuration, rule.copy())
+    assert first.table is second.table
+    assert not first.table.flags.writeable
+    second.rule = initializers.random(first.states, size=rule.shape)
+    assert second.table is not first.table
+
+
+def test_cache_size():
+    class Elementary(MultiStepAutomaton):
+        neighbours = neighbours.regular(ndim=1, r=1)
+        states = 2
+        cache_size = 2**10
+
+    rule = initializers.random(states=2, size=[2] * 3)
+    ca = Elementary(initializers.random(states=2, size=[64]), rule)
+    assert ca.steps == 4  # Windows of 9 cells, 512 bytes
+    assert ca.table.nbytes <= Elementary.cache_size
+    Elementary.cache_size = 4  # No block fits, base engine is used
+    ca = Elementary(initializers.random(states=2, size=[64]), rule)
+    expected = BaseAutomaton.evolve(Elementary(ca.configuration, rule), 5)
+    assert ca.steps == 1 and np.array_equal(ca.evolve(5), expected)
+    assert len(multistep._tables) <= multistep.max_tables
+
+
+def test_requirements():
+    class Planar(MultiStepAutomaton):
+        neighbours = neighbours.regular(ndim=2, r=1)
+        states = 2
+
+    rule = np.zeros([2] * 9, "uint8")
+    with raises(ValueError):
+        Planar(initializers.zeros(2, [8, 8]), rule)
+
+    class Open(MultiStepAutomaton):
+        neighbours = neighbours.regular(ndim=1, r=1)
+        states = 2
+        boundary = "open"
+
+    with raises(ValueError):
+        Open(initializers.zeros(2, [8]), np.zeros([2] * 3, "uint8"))
+
+
+def test_configuration_dtype(automaton_classes, configuration, rule):
+    automaton, multi_step = automaton_classes
+    expected = automaton(configuration, rule).evolve(40)
+    result = multi_step(configuration.astype("int64"), rule).evolve(40)
+    assert result.dtype == "int64" and np.array_equal(result, expected)
+
+
+def test_trusted_buffer(automaton_classes, configuration, rule):
+    automaton, multi_step = automaton_classes
+    expected = automaton(configuration, rule).evolve(41)
+    ca = multi_step(configuration, rule, trusted=True)
+    ca.evolve(41)
+    assert ca.configuration is configuration
+    assert np.array_equal(configuration, expected)
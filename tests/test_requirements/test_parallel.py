@@ -0,0 +1,57 @@
+"""Module to test multi-core tiled automaton evolution."""
+import numpy as np
+from ndautomata import BaseAutomaton, TotalisticAutomaton, backends, parallel
+from ndautomata import initializers, neighbours
+from pytest import mark
+
+KERNELS = [
+    (BaseAutomaton, neighbours.regular(ndim=1, r=2)),
+    (BaseAutomaton, neighbours.regular(ndim=2, r=1)),
+    (BaseAutomaton, neighbours.orthogonal([2, 5])),
+    (TotalisticAutomaton, neighbours.regular(ndim=2, r=3)),
+    (TotalisticAutomaton, neighbours.regular(ndim=3, r=1)),
+]
+
+
+def automaton_class(base, kernel):
+    class Automaton(base):
+        neighbours = kernel
+        states = 2
+
+    return Automaton
+
+
+def random_rule(automaton_class):
+    if issubclass(automaton_class, TotalisticAutomaton):
+        size = [2, automaton_class.max_sum + 1]
+    else:
+        size = [2] * automaton_class.neighbours.size
+    return initializers.random(2, size)
+
+
+@mark.parametrize("length, workers", [(10, 3), (2, 4), (7, 7)])
+def test_tiles_cover(length, workers):
+    tiles = parallel.tiles(length, workers)
+    assert len(tiles) == min(length, workers)
+    assert [x for start, stop in tiles for x in range(start, stop)] == [
+        *range(length)
+    ]
+
+
+def test_halo_wraps():
+    source = np.arange(6)
+    assert np.shares_memory(parallel.halo(source, 2, 4, 1, 1), source)
+    assert np.all(parallel.halo(source, 0, 2, 2, 1) == [4, 5, 0, 1, 2])
+    assert np.all(parallel.halo(source, 4, 6, 1, 2) == [3, 4, 5, 0, 1])
+
+
+@mark.parametrize("base, kernel", KERNELS)
+@mark.parametrize("backend", backends.BACKENDS)
+@mark.parametrize("workers", [2, 3, 8])
+def test_tiled_matches_single(base, kernel, backend, workers):
+    Automaton = automaton_class(base, kernel)
+    ic = initializers.random(2, [9, 8, 7][: kernel.ndim])
+    rule = random_rule(Automaton)
+    expected = Automaton(ic, rule).evolve(5)
+    tiled = Automaton(ic, rule, backend=backend, workers=workers)
+    assert np.all(tiled.evolve(5) == expected)
@@ -0,0 +1,78 @@
+"""Module to test the profiling hooks."""
+import numpy as np
+from ndautomata import BaseAutomaton, initializers, neighbours, profiling
+from pytest import fixture, mark
+
+
+class Automaton(BaseAutomaton):
+    neighbours = neighbours.regular(ndim=2, r=1)
+    states = 2
+
+
+@fixture
+def automaton():
+    rule = initializers.random(2, [2] * 9)
+    return Automaton(initializers.random(2, [20, 30]), rule)
+
+
+def test_phases(automaton):
+    with profiling.Profiler().attach(automaton) as profiler:
+        automaton.evolve(5)
+        next(automaton)
+    stats = profiler.stats
+    assert stats["transition"].calls == 6
+    assert stats["correlate"].calls == stats["gather"].calls == 6
+    assert stats["copy"].calls == 1
+    assert stats["transition"].cells == 6 * 600
+    assert stats["transition"].rate > 0
+    assert "transition" in profiler.report()
+
+
+def test_detached_unchanged(automaton):
+    expected = Automaton(automaton.configuration, automaton.rule).evolve(8)
+    profiler = profiling.Profiler().attach(automaton)
+    automaton.evolve(4)
+    profiler.detach(automaton)
+    assert "_transition" not in vars(automaton)
+    automaton.evolve(4)
+    assert profiler.stats["transition"].calls == 4
+    assert np.array_equal(automaton.configuration, expected)
+
+
+def test_callback(automaton):
+    records = []
+    with profiling.Profiler(records.append).attach(automaton, ["gather"]):
+        automaton.evolve(3)
+    assert [x.phase for x in records] == ["gather"] * 3
+    assert all(x.bytes is None and x.seconds >= 0 for x in records)
+
+
+@mark.parametrize("workers", [1, 3])
+def test_memory(automaton, workers):
+    automaton.workers = workers
+    with profiling.Profiler(memory=True).attach(automaton) as profiler:
+        next(automaton)
+    assert profiler.stats["copy"].bytes >= automaton.configuration.nbytes
+
+
+def test_nested_memory(automaton):
+    class Temporary(Automaton):
+        def _indexes(self, configuration, *args):
+            np.ones(2**20, dtype="uint8").sum()  # Freed before gather
+            return super()._indexes(configuration, *args)
+
+    ca = Temporary(automaton.configuration, automaton.rule)
+    with profiling.Profiler(memory=True).attach(ca) as profiler:
+        ca.evolve(2)
+    stats = profiler.stats
+    assert stats["correlate"].bytes >= 2**20
+    assert stats["transition"].bytes >= stats["correlate"].bytes
+
+
+def test_tiled_phases(automaton):
+    automaton.workers = 3
+    with profiling.Profiler().attach(automaton) as profiler:
+        automaton.evolve(2)
+    stats = profiler.stats
+    assert stats["correlate"].calls == stats["gather"].calls == 6
+    assert stats["correlate"].cells >= 2 * 600  # Tiles include halos
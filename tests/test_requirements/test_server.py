@@ -0,0 +1,153 @@
+"""Module to test the shared memory simulation server."""
+import os
+import time
+from multiprocessing import AuthenticationError, shared_memory
+
+import numpy as np
+from ndautomata import BaseAutomaton, initializers, neighbours
+from ndautomata.server import Client, Server
+from pytest import fixture, raises
+
+
+class Automaton(BaseAutomaton):
+    neighbours = neighbours.regular(ndim=2, r=1)
+    states = 2
+
+
+@fixture(scope="module")
+def server(tmp_path_factory):
+    address = str(tmp_path_factory.mktemp("server") / "ndautomata.sock")
+    with Server(address, workers=2) as server:
+        server.start()
+        yield server
+
+
+@fixture
+def client(server):
+    with Client(server.address, server.authkey) as client:
+        yield client
+
+
+@fixture
+def rule():
+    return initializers.random(states=2, size=[2] * 9)
+
+
+def test_rules_shared(server, client, rule):
+    rule_id = client.add_rule(rule)
+    assert client.add_rule(rule.copy()) == rule_id
+    assert server.add_rule(rule) == rule_id
+    handle = server.rules[rule_id]
+    memory = shared_memory.SharedMemory(handle.name)
+    shared = np.ndarray(handle.shape, handle.dtype, buffer=memory.buf)
+    assert np.array_equal(shared, rule)
+    del shared
+    memory.close()
+
+
+def test_jobs(client, rule):
+    rule_id = client.add_rule(rule)
+    configurations = [initializers.random(2, [16, 16]) for _ in range(4)]
+    jobs = [client.submit(Automaton, rule_id, x, 5) for x in configurations]
+    for job, configuration in reversed(list(zip(jobs, configurations))):
+        result = client.result(job)
+        expected = Automaton(configuration, rule).evolve(5)
+        assert result.generation == 5
+        assert np.array_equal(result.array, expected)
+        name = result.handle.name
+        result.release()
+        with raises(FileNotFoundError):
+            shared_memory.SharedMemory(name)
+
+
+def test_record(client, rule):
+    rule_id = client.add_rule(rule)
+    configuration = initializers.random(2, [8, 8])
+    spec = f"{__name__}:Automaton"
+    job = client.submit(spec, rule_id, configuration, 3, stride=2, record=True)
+    result = client.result(job)
+    out = np.empty((3, 8, 8), dtype="uint8")
+    expected = Automaton(configuration, rule).evolve(3, out, stride=2)
+    assert result.generation == 6
+    assert np.array_equal(result.array, expected)
+    result.release()
+
+
+def test_errors(client, rule):
+    job = client.submit(Automaton, "unknown", np.zeros([8, 8], "uint8"), 1)
+    with raises(KeyError):
+        client.result(job)
+    rule_id = client.add_rule(rule)
+    configuration = np.full([8, 8], 2, dtype="uint8")  # Invalid states
+    with raises(ValueError):
+        client.result(client.submit(Automaton, rule_id, configuration, 1))
+    job = client.submit(Automaton, rule_id, configuration % 2, 0)
+    result = client.result(job)
+    assert not result.array.any()  # The connection is still usable
+    result.release()
+
+
+def test_close_frees_rules(tmp_path, rule):
+    with Server(str(tmp_path / "socket"), workers=1) as server:
+        handle = server.rules[server.add_rule(rule)]
+    with raises(FileNotFoundError):
+        shared_memory.SharedMemory(handle.name)
+
+
+def test_authkey(server):
+    assert len(server.authkey) == 32
+    with raises(AuthenticationError):
+        Client(server.address, b"wrong key")
+
+
+def segments():
+    return set(os.listdir("/dev/shm"))
+
+
+def wait_freed(before):
+    deadline = time.monotonic() + 10
+    while segments() - before and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return not segments() - before
+
+
+def test_disconnect_frees_results(server, rule):
+    configuration = initializers.random(2, [16, 16])
+    with Client(server.address, server.authkey) as client:
+        rule_id = client.add_rule(rule)
+        before = segments()
+        first = client.submit(Automaton, rule_id, configuration, 5)
+        last = client.submit(Automaton, rule_id, configuration, 5)
+        result = client.result(last)
+        while first not in client._done:  # Received but not collected
+            client._receive(None)
+    assert wait_freed(before | {result.handle.name})
+    result.release()
+
+
+def test_left_client_frees_results(tmp_path, rule):
+    configuration = initializers.random(2, [64, 64])
+    with Server(str(tmp_path / "socket"), workers=1) as server:
+        server.start()
+        client = Client(server.address, server.authkey)
+        rule_id = client.add_rule(rule)
+        before = segments()
+        client.submit(Automaton, rule_id, configuration, 50)
+        client.close()  # Leaves before the job is done
+        with Client(server.address, server.authkey) as client:
+            job = client.submit(Automaton, rule_id, configuration, 1)
+            client.result(job).release()  # Runs after the first job
+        assert wait_freed(before)
+
+
+def test_close_frees_results(tmp_path, rule):
+    before = segments()
+    with Server(str(tmp_path / "socket"), workers=1) as server:
+        server.start()
+        client = Client(server.address, server.authkey)
+        rule_id = client.add_rule(rule)
+        configuration = initializers.random(2, [16, 16])
+        for _ in range(2):  # Results sent or not, never collected
+            client.submit(Automaton, rule_id, configuration, 5)
+    client.close()
+    assert not segments() - before
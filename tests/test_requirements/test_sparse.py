@@ -0,0 +1,64 @@
+"""Module to test active region evolution of quiescent automata."""
+import numpy as np
+from ndautomata import BaseAutomaton, initializers, neighbours
+from ndautomata.sparse import SparseAutomaton
+from pytest import mark
+
+KERNELS = [
+    neighbours.regular(ndim=1, r=1),
+    neighbours.regular(ndim=1, r=3),
+    neighbours.regular(ndim=2, r=1),
+    neighbours.orthogonal([2, 3]),
+]
+
+
+def automaton_classes(kernel, block, threshold):
+    class Automaton(BaseAutomaton):
+        neighbours = kernel
+        states = 2
+
+    class Sparse(SparseAutomaton, Automaton):
+        pass
+
+    Sparse.block, Sparse.threshold = block, threshold
+    return Automaton, Sparse
+
+
+def quiescent_rule(size, active):
+    rule = np.zeros(2**size, dtype="uint8")
+    rule[0] = active  # All zero neighbourhood, active -> 1
+    rule[1:] = initializers.random(2, [2**size - 1])
+    return rule.reshape([2] * size)
+
+
+@mark.parametrize("kernel", KERNELS)
+@mark.parametrize("initializer", [initializers.center, initializers.border])
+@mark.parametrize("block, threshold", [(4, 1.0), (5, 0.3), (64, 0.5)])
+@mark.parametrize("active", [0, 1])
+def test_matches_dense(kernel, initializer, block, threshold, active):
+    Automaton, Sparse = automaton_classes(kernel, block, threshold)
+    ic = initializer(2, [19, 23][: kernel.ndim])
+    rule = quiescent_rule(kernel.size, active)
+    ca, ref = Sparse(ic, rule), Automaton(ic, rule)
+    for _ in range(12):
+        assert np.all(next(ca) == next(ref))
+
+
+def test_evolve_out():
+    Automaton, Sparse = automaton_classes(KERNELS[2], 4, 1.0)
+    ic, rule = initializers.center(2, [16, 16]), quiescent_rule(9, 0)
+    out = np.empty((6, 16, 16), dtype="uint8")
+    expected = np.empty_like(out)
+    Sparse(ic, rule).evolve(6, out=out, stride=2)
+    Automaton(ic, rule).evolve(6, out=expected, stride=2)
+    assert np.all(out == expected)
+
+
+def test_active_blocks():
+    Automaton, Sparse = automaton_classes(KERNELS[0], 8, 1.0)
+    rule = np.zeros([2] * 3, dtype="uint8")
+    rule[0, 1, 0] = 1  # Single cells persist
+    ca = Sparse(initializers.center(2, [64]), rule)
+    ca.evolve(2)
+    assert ca._changes.sum() == 0
+    assert ca.configuration[32] == 1
@@ -0,0 +1,69 @@
+"""Module to test streaming evolutions to disk."""
+import numpy as np
+from ndautomata import BaseAutomaton, initializers, neighbours, storage
+from pytest import fixture, mark, raises
+
+
+class Automaton(BaseAutomaton):
+    neighbours = neighbours.regular(ndim=2, r=1)
+    states = 2
+
+
+@fixture(scope="module")
+def rule():
+    return initializers.random(2, [2] * 9)
+
+
+@fixture
+def configuration():
+    return initializers.random(2, [12, 20])
+
+
+@mark.parametrize("chunk", [None, 4, 7])
+@mark.parametrize("packbits", [False, True])
+@mark.parametrize("stride", [1, 3])
+def test_roundtrip(tmp_path, configuration, rule, chunk, packbits, stride):
+    expected = np.empty((30, 12, 20), dtype="uint8")
+    Automaton(configuration, rule).evolve(30, expected, stride)
+    ca = Automaton(configuration, rule)
+    spacetime = storage.write(ca, tmp_path, 30, stride, chunk, packbits)
+    assert spacetime.shape == (30, 12, 20) and spacetime.stride == stride
+    assert np.array_equal(np.asarray(storage.Spacetime(tmp_path)), expected)
+    assert np.array_equal(ca.configuration, expected[-1])
+
+
+@mark.parametrize("chunk", [None, 16])
+@mark.parametrize("packbits", [False, True])
+def test_roundtrip_batches(tmp_path, configuration, rule, chunk, packbits):
+    expected = np.empty((150, 12, 20), dtype="uint8")
+    Automaton(configuration, rule).evolve(150, expected)
+    ca = Automaton(configuration, rule)
+    storage.write(ca, tmp_path, 150, chunk=chunk, packbits=packbits)
+    assert np.array_equal(np.asarray(storage.Spacetime(tmp_path)), expected)
+
+
+@mark.parametrize("chunk", [None, 8])
+@mark.parametrize("packbits", [False, True])
+def test_lazy_slices(tmp_path, configuration, rule, chunk, packbits):
+    expected = np.empty((20, 12, 20), dtype="uint8")
+    Automaton(configuration, rule).evolve(20, expected)
+    ca = Automaton(configuration, rule)
+    spacetime = storage.write(ca, tmp_path, 20, chunk=chunk, packbits=packbits)
+    for key in [5, -1, slice(3, 17, 2), (7, slice(2, 5)), (slice(6, 10), 3)]:
+        assert np.array_equal(spacetime[key], expected[key])
+    assert np.array_equal(spacetime[4:9, 1:3, 10:], expected[4:9, 1:3, 10:])
+    assert spacetime[20:].shape == (0, 12, 20)
+
+
+def test_packbits_size(tmp_path, configuration, rule):
+    storage.write(Automaton(configuration, rule), tmp_path, 16, packbits=True)
+    assert np.load(tmp_path / "frames.npy").shape == (16, 12, 3)
+
+
+def test_packbits_states(tmp_path, configuration):
+    class Ternary(Automaton):
+        states = 3
+
+    ca = Ternary(configuration, initializers.random(3, [3] * 9))
+    with raises(ValueError):
+        storage.write(ca, tmp_path, 4, packbits=True)
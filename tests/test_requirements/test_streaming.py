@@ -0,0 +1,116 @@
+"""Module to test streaming generations to live consumers."""
+import asyncio
+import time
+
+import numpy as np
+from ndautomata import BaseAutomaton, initializers, neighbours
+from ndautomata.streaming import Stream
+from pytest import fixture, mark, raises
+
+
+class Automaton(BaseAutomaton):
+    neighbours = neighbours.regular(ndim=2, r=1)
+    states = 2
+
+
+@fixture
+def automaton():
+    rule = initializers.random(states=2, size=[2] * 9)
+    return Automaton(initializers.random(states=2, size=[16, 16]), rule)
+
+
+def expected(automaton, steps, stride=1):
+    copy = Automaton(automaton.configuration, automaton.rule)
+    out = np.empty((steps, *automaton.configuration.shape), "uint8")
+    return copy.evolve(steps, out, stride)
+
+
+@mark.parametrize("stride", [1, 3])
+def test_iterate(automaton, stride):
+    generations = expected(automaton, 20, stride)
+    with Stream(automaton, 20, stride=stride, maxsize=2) as frames:
+        for step, frame in enumerate(frames):
+            assert frame.generation == (step + 1) * stride
+            assert np.array_equal(frame.configuration, generations[step])
+            assert not frame.configuration.flags.writeable
+    assert step == 19
+
+
+def test_async(automaton):
+    generations = expected(automaton, 10)
+
+    async def consume():
+        return [frame.generation async for frame in Stream(automaton, 10)]
+
+    assert asyncio.run(consume()) == list(range(1, 11))
+    assert np.array_equal(automaton.configuration, generations[-1])
+
+
+def test_backpressure(automaton):
+    with Stream(automaton, maxsize=3) as frames:
+        time.sleep(0.2)  # Producer waits for the consumer
+        assert automaton.generation <= 3 + 2
+        assert next(frames).generation == 1
+
+
+def test_drop(automaton):
+    generations = expected(automaton, 200)
+    with Stream(automaton, 200, maxsize=2, drop=True) as frames:
+        time.sleep(0.3)
+        received = [(x.generation, x.configuration.copy()) for x in frames]
+        assert frames.dropped == 200 - len(received) > 0
+    assert received[-1][0] == 200
+    for generation, configuration in received:
+        assert np.array_equal(configuration, generations[generation - 1])
+
+
+def test_shared_ring(automaton):
+    ring = np.empty((4, 16, 16), dtype="uint8")
+    frames = Stream(automaton, 5, maxsize=2, out=ring)
+    frame = next(frames)
+    assert np.shares_memory(frame.configuration, ring)
+    frames.close()
+    assert list(frames) == []
+    with raises(ValueError):
+        Stream(automaton, 5, maxsize=3, out=ring)
+
+
+def test_errors(automaton):
+    automaton.rule = np.full([2] * 9, 1, dtype="uint8")
+    automaton._rule = np.zeros(1, dtype="uint8")  # Indexes out of range
+    automaton._mode = "raise"
+    with raises(IndexError):
+        list(Stream(automaton, 5))
+
+
+def slow_automaton():
+    rule = initializers.random(states=2, size=[2] * 9)
+    return Automaton(initializers.random(2, [1000, 1000]), rule)
+
+
+def test_close_while_waiting():
+    frames = Stream(slow_automaton(), stride=20)
+
+    async def consume():
+        waiting = asyncio.ensure_future(frames.__anext__())
+        await asyncio.sleep(0.05)
+        frames.close()
+        with raises(StopAsyncIteration):
+            await asyncio.wait_for(waiting, 5)
+
+    asyncio.run(consume())
+
+
+def test_cancel_while_waiting():
+    frames = Stream(slow_automaton(), stride=20)
+
+    async def consume():
+        waiting = asyncio.ensure_future(frames.__anext__())
+        await asyncio.sleep(0.05)
+        waiting.cancel()
+        with raises(asyncio.CancelledError):
+            await waiting
+        return await asyncio.wait_for(frames.__anext__(), 30)
+
+    with frames:
+        assert asyncio.run(consume()).generation == 20  # Frame not lost
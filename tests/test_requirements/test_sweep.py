@@ -0,0 +1,83 @@
+"""Module to test the rule space sweeps."""
+import numpy as np
+from ndautomata import BaseAutomaton, initializers, neighbours, sweep
+from pytest import fixture, mark, raises
+
+
+class Elementary(BaseAutomaton):
+    neighbours = neighbours.regular(ndim=1, r=1)
+    states = 2
+
+
+class Ternary(BaseAutomaton):
+    neighbours = neighbours.regular(ndim=1, r=1)
+    states = 3
+
+
+@fixture(scope="module")
+def elementary():
+    return sweep.run(Elementary, range(256), [64], 20, workers=1)
+
+
+def test_from_code():
+    rule = np.unpackbits(np.uint8(30), bitorder="little").reshape([2] * 3)
+    assert np.array_equal(sweep.from_code(30, 2, 3), rule)
+    assert sweep.from_code(3**27 - 1, 3, 3).min() == 2
+    with raises(ValueError):
+        sweep.from_code(256, 2, 3)
+
+
+def test_statistics():
+    assert sweep.langton(sweep.from_code(0, 2, 3)) == 0
+    assert sweep.langton(sweep.from_code(30, 2, 3)) == 0.5
+    assert sweep.entropy(np.array([0, 1, 2, 0, 1, 2]), 3) == np.log2(3)
+    assert sweep.entropy(np.zeros(8, dtype="uint8"), 2) == 0
+
+
+def test_elementary(elementary):
+    assert np.array_equal(elementary["index"], np.arange(256))
+    assert np.array_equal(elementary["code"], np.arange(256))
+    assert elementary["lambda"][255] == 1 and elementary["lambda"][0] == 0
+    assert elementary["density"][0] == 0 and elementary["density"][255] == 1
+    assert elementary["activity"][204] == 0  # Identity rule
+    assert elementary["damage"][204] == 1 / 64
+    assert elementary["damage"][30] > 4 / 64  # Chaotic rule spreads
+    for name in ["density", "entropy", "activity", "damage"]:
+        assert np.all((elementary[name] >= 0) & (elementary[name] <= 1))
+
+
+def test_workers(elementary, tmp_path):
+    path = tmp_path / "sweep.npz"
+    columns = sweep.run(Elementary, range(256), [64], 20, workers=2, path=path)
+    with np.load(path) as saved:
+        for name in sweep.COLUMNS:
+            assert np.array_equal(columns[name], elementary[name])
+            assert np.array_equal(saved[name], elementary[name])
+
+
+@mark.parametrize("workers", [1, 2])
+def test_tables(workers):
+    tables = (initializers.random(3, [3] * 3) for _ in range(10))
+    columns = sweep.run(
+        Ternary,
+        tables,
+        [32],
+        10,
+        initializer=initializers.center,
+        transient=5,
+        damage=False,
+        workers=workers,
+        batch=3,
+    )
+    assert np.array_equal(columns["index"], np.arange(10))
+    assert np.all(columns["code"] == -1)
+    assert np.all(np.isnan(columns["damage"]))
+    assert np.all(columns["entropy"] <= np.log2(3))
+
+
+def test_global_random_state():
+    np.random.seed(7)
+    expected = np.random.random(4)
+    np.random.seed(7)
+    sweep.run(Elementary, range(4), [16], 2, workers=1)
+    assert np.array_equal(np.random.random(4), expected)
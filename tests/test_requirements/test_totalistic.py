@@ -0,0 +1,87 @@
+"""Module to test totalistic automaton features and requirements."""
+import numpy as np
+from ndautomata import BaseAutomaton, TotalisticAutomaton
+from ndautomata import initializers, neighbours
+from pytest import mark, raises
+
+
+def life(center, total):
+    return np.where(center == 1, (total == 2) | (total == 3), total == 3)
+
+
+class TestGameOfLife:
+    class Automaton(TotalisticAutomaton):
+        neighbours = neighbours.regular(ndim=2, r=1)
+        states = 2
+
+    class Reference(BaseAutomaton):
+        neighbours = neighbours.regular(ndim=2, r=1)
+        states = 2
+
+    @classmethod
+    def rules(cls):
+        center, total = np.indices((2, cls.Automaton.max_sum + 1))
+        rule = life(center, total).astype("uint8")
+        digits = np.indices([2] * 9).reshape(9, -1)
+        full = life(digits[4], digits.sum(axis=0) - digits[4])
+        return rule, full.astype("uint8").reshape([2] * 9)
+
+    def test_max_sum(self):
+        assert self.Automaton.max_sum == 8
+        assert self.Automaton.center == (1, 1)
+
+    def test_rule_shape(self):
+        rule, _ = self.rules()
+        ca = self.Automaton(initializers.zeros(2, [5, 5]), rule)
+        assert ca.rule.shape == (2, 9)
+
+    def test_invalid_rule_shape(self):
+        with raises(ValueError):
+            self.Automaton(initializers.zeros(2, [5, 5]), np.zeros((2, 8)))
+
+    @mark.parametrize("repeat", range(5))
+    def test_matches_full_table(self, repeat):
+        rule, full = self.rules()
+        ic = initializers.random(states=2, size=[16, 12])
+        ca, ref = self.Automaton(ic, rule), self.Reference(ic, full)
+        for _ in range(10):
+            assert np.all(next(ca) == next(ref))
+
+
+class TestTernaryHexagonal:
+    class Automaton(TotalisticAutomaton):
+        neighbours = neighbours.hexagonal(ndim=2, r=1)
+        states = 3
+
+    def test_max_sum(self):
+        assert self.Automaton.max_sum == 12
+
+    @mark.parametrize("repeat", range(5))
+    def test_rule_indexes(self, repeat):
+        rule = initializers.random(states=3, size=[3, 13])
+        ic = initializers.random(states=3, size=[6, 7])
+        nc = next(self.Automaton(ic, rule))
+        offsets = [(-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0)]
+        for i, j in np.ndindex(ic.shape):
+            total = sum(ic[(i + x) % 6, (j + y) % 7] for x, y in offsets)
+            assert nc[i, j] == rule[ic[i, j], total]
+
+
+class TestLargeRadius:
+    class Automaton(TotalisticAutomaton):
+        neighbours = neighbours.regular(ndim=3, r=2)
+        states = 4
+
+    def test_rule_size(self):
+        assert self.Automaton.max_sum == 124 * 3
+
+    def test_next(self):
+        rule = initializers.random(states=4, size=[4, 373])
+        ic = initializers.random(states=4, size=[8, 8, 8])
+        nc = next(self.Automaton(ic, rule))
+        total = sum(
+            np.roll(ic, shift, axis=(0, 1, 2)).astype(int)
+            for shift in np.ndindex(5, 5, 5)
+        )
+        total = np.roll(total, (-2, -2, -2), axis=(0, 1, 2)) - ic
+        assert np.all(nc == rule[ic, total])
@@ -0,0 +1,71 @@
+"""Module to test the rule index computation strategies."""
+import numpy as np
+from ndautomata import boundaries, indexing, neighbours
+from pytest import fixture, mark, raises
+from scipy.ndimage import correlate
+
+KERNELS = [
+    neighbours.regular(ndim=1, r=2),
+    neighbours.regular(ndim=2, r=1),
+    neighbours.orthogonal([2, 3]),
+    neighbours.hexagonal(ndim=2, r=1),
+    neighbours.von_neumann(ndim=2, r=2),
+    neighbours.regular(ndim=3, r=1),
+]
+
+
+@fixture(params=KERNELS)
+def kernel(request):
+    return request.param
+
+
+@fixture
+def configuration(kernel):
+    return np.random.randint(3, size=[7, 6, 5][: kernel.ndim], dtype="uint8")
+
+
+def test_factors():
+    vectors = indexing.factors(neighbours.regular(ndim=2, r=1).weights(2))
+    assert vectors == [[64, 8, 1], [4, 2, 1]]
+    hexagonal = neighbours.hexagonal(ndim=2, r=1).weights(2)
+    assert indexing.factors(hexagonal) is None
+    assert indexing.factors(np.array([[1, 2], [3, 4]])) is None
+
+
+@mark.parametrize("boundary", list(boundaries.MODES))
+@mark.parametrize("strategy", indexing.STRATEGIES)
+def test_strategies(kernel, configuration, boundary, strategy):
+    weights = kernel.weights(3)
+    mode = boundaries.MODES[boundary]
+    expected = correlate(configuration, weights, "int64", mode, cval=2)
+    if strategy == "separable" and indexing.factors(weights) is None:
+        with raises(ValueError):
+            indexing.Indexer(weights, boundary, 2, strategy)
+        return
+    indexer = indexing.Indexer(weights, boundary, 2, strategy)
+    output = np.empty(configuration.shape, "int64")
+    for _ in range(2):  # Buffers are reused
+        assert indexer(configuration, output) is output
+        assert np.array_equal(output, expected)
+
+
+def test_batch_axis():
+    weights = neighbours.regular(ndim=2, r=1).weights(2)[np.newaxis] * 3
+    configuration = np.random.randint(2, size=[4, 8, 8], dtype="uint8")
+    expected = correlate(configuration, weights, "uint32", mode="wrap")
+    for strategy in indexing.STRATEGIES:
+        indexer = indexing.Indexer(weights, "wrap", 0, strategy)
+        output = np.empty(configuration.shape, "uint32")
+        assert np.array_equal(indexer(configuration, output), expected)
+
+
+def test_choose():
+    regular = neighbours.regular(ndim=3, r=1).weights(2)
+    assert indexing.choose(regular) == "separable"
+    von_neumann = neighbours.von_neumann(ndim=3, r=1).weights(2)
+    assert indexing.choose(von_neumann) == "shifted"
+    indexer = indexing.Indexer(np.ones([3, 3], "uint"), "wrap", 0)
+    indexer(np.zeros([4, 4], "uint8"), np.empty([4, 4], "uint8"))
+    assert indexer.strategy in indexing.STRATEGIES
+    with raises(ValueError):
+        indexing.Indexer(np.ones([3, 3], "uint"), "wrap", 0, "fourier")
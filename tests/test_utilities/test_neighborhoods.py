@@ -1,5 +1,8 @@
+import pickle
+
 from ndautomata import neighbours
 import numpy as np
+from pytest import raises
 
 
 def test_1dr1():
@@ -30,3 +33,57 @@ def test_3dr1():
 def test_3dr2():
     expected = np.flip(np.arange(125).reshape((5, 5, 5)) + 1)
     assert np.all(neighbours.regular(ndim=3, r=2) == expected)
+
+
+def test_hexagonal_2d():
+    expected = np.array([[0, 7, 6], [5, 4, 3], [2, 1, 0]])
+    assert np.array_equal(neighbours.hexagonal(ndim=2, r=1), expected)
+
+
+def test_hexagonal_3d():
+    kernel = neighbours.hexagonal(ndim=3, r=1)
+    assert kernel.shape == (3, 3, 3) and np.count_nonzero(kernel) == 13
+    assert np.array_equal(np.sort(kernel.values), np.arange(1, 14))
+    assert kernel[0, 0, 0] == kernel[2, 2, 2] == kernel[0, 0, 1] == 0
+    assert kernel[0, 1, 2] != 0  # Offset (-1, 0, +1)
+
+
+def test_von_neumann():
+    expected = np.array([[0, 5, 0], [4, 3, 2], [0, 1, 0]])
+    assert np.array_equal(neighbours.von_neumann(ndim=2, r=1), expected)
+    assert np.count_nonzero(neighbours.von_neumann(ndim=3, r=2)) == 25
+
+
+def test_sparse():
+    offsets = [[0, 2], [0, 0], [-1, 0], [0, 0]]
+    kernel = neighbours.sparse(offsets)
+    assert kernel.shape == (3, 5) and kernel.centre == (1, 2)
+    assert np.array_equal(kernel.offsets, [[-1, 0], [0, 0], [0, 2]])
+    assert np.array_equal(kernel.values, [3, 2, 1])
+    assert kernel.halo == ((1, 1), (2, 2))
+    with raises(ValueError):
+        neighbours.sparse(np.zeros((0, 2)))
+
+
+def test_canonical():
+    kernel = neighbours.regular(ndim=2, r=1)
+    assert kernel is neighbours.regular(ndim=2, r=1)
+    assert kernel is neighbours.Neighbourhood(np.asarray(kernel).copy())
+    assert {kernel: 1}[neighbours.orthogonal([3, 3])] == 1
+    assert pickle.loads(pickle.dumps(kernel)) is kernel
+    with raises(ValueError):
+        kernel[0, 0] = 2
+    with raises(TypeError):
+        hash(kernel.ravel())
+    assert type(kernel != 0) is np.ndarray
+
+
+def test_derived_cached():
+    kernel = neighbours.hexagonal(ndim=2, r=1)
+    weights = kernel.weights(3)
+    assert weights is kernel.weights(3) and not weights.flags.writeable
+    assert weights[0, 1] == 3**6 and weights[0, 0] == 0
+    offsets, terms = kernel.terms(3)
+    assert np.array_equal(terms, weights[kernel.mask])
+    assert np.array_equal(offsets + 1, np.argwhere(kernel.mask))
+    assert kernel.offsets is offsets
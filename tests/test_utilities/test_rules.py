@@ -0,0 +1,160 @@
+from ndautomata import BaseAutomaton, initializers, neighbours, rules
+import numpy as np
+from pytest import mark, raises
+
+
+def elementary(number):
+    table = np.unpackbits(np.uint8(number), bitorder="little")
+    return table.reshape([2] * 3)
+
+
+def test_compile_regular():
+    kernel = neighbours.regular(ndim=2, r=1)
+    rule = initializers.random(states=3, size=[3] * 9)
+    compiled = rules.compile(kernel, 3, rule)
+    assert compiled.table.size == rule.size
+    assert np.all(compiled.table == rule.ravel())
+    assert np.all(compiled.expand() == rule.ravel())
+
+
+def test_compile_hexagonal():
+    kernel = neighbours.hexagonal(ndim=2, r=1)
+    rule = initializers.random(states=2, size=[2] * 9)
+    compiled = rules.compile(kernel, 2, rule)
+    assert compiled.table.size == 2**7
+    assert compiled.reduction == 2**7 / 2**9
+    assert np.all(compiled.weights[kernel == 0] == 0)
+    assert "compact entries: 128" in compiled.report()
+
+
+@mark.parametrize("nstates", [2, 3])
+def test_compact_automaton(nstates):
+    class Automaton(BaseAutomaton):
+        neighbours = neighbours.hexagonal(ndim=2, r=1)
+        states = nstates
+
+    class Compact(Automaton):
+        compact = True
+
+    rule = initializers.random(states=nstates, size=[nstates] * 9)
+    ic = initializers.random(states=nstates, size=[8, 9])
+    ca, ref = Compact(ic, rule), Automaton(ic, rule)
+    assert ca._rule.size < ref._rule.size
+    assert np.all(ca.evolve(5) == ref.evolve(5))
+
+
+@mark.parametrize("kernel, count", [
+    (neighbours.regular(ndim=1, r=1), 2),
+    (neighbours.regular(ndim=2, r=1), 8),
+    (neighbours.orthogonal([2, 5]), 4),
+    (neighbours.regular(ndim=3, r=1), 48),
+])
+def test_symmetries(kernel, count):
+    assert len(rules.symmetries(kernel)) == count
+
+
+def test_symmetries_hexagonal():
+    with raises(ValueError):
+        rules.symmetries(neighbours.hexagonal(ndim=2, r=1))
+
+
+@mark.parametrize("rule, mirror", [(110, 124), (30, 86), (90, 90)])
+def test_canonical_elementary(rule, mirror):
+    kernel = neighbours.regular(ndim=1, r=1)
+    canonical = rules.canonical(kernel, elementary(rule))
+    assert np.all(canonical == rules.canonical(kernel, elementary(mirror)))
+
+
+def test_equivalence_classes():
+    kernel = neighbours.regular(ndim=1, r=1)
+    labels = rules.equivalence_classes(kernel, 2)
+    assert np.all(labels == [0, 1, 2, 3, 1, 5, 3, 7])
+
+
+def test_symmetric_life():
+    digits = np.indices([2] * 9).reshape(9, -1)
+    total = digits.sum(axis=0) - digits[4]
+    rule = np.where(digits[4] == 1, (total == 2) | (total == 3), total == 3)
+    kernel = neighbours.regular(ndim=2, r=1)
+    assert rules.is_symmetric(kernel, rule.reshape([2] * 9))
+    assert rules.compile(kernel, 2, rule).symmetric is None  # Opt-in
+    compiled = rules.compile(kernel, 2, rule.reshape([2] * 9), True)
+    assert compiled.symmetric
+    assert "symmetry classes: 102" in compiled.report(kernel)
+    assert not rules.is_symmetric(kernel, np.arange(2**9) % 2)
+    hexagonal = neighbours.hexagonal(ndim=2, r=1)
+    rule = np.zeros(2**hexagonal.size, "uint8")
+    assert rules.compile(hexagonal, 2, rule, True).symmetric is None
+
+
+def life(x):
+    return (x.sum == 3) | (x.centre == 1) & (x.sum == 2)
+
+
+def test_build_life():
+    digits = np.indices([2] * 9).reshape(9, -1)
+    total = digits.sum(axis=0) - digits[4]
+    rule = np.where(digits[4] == 1, (total == 2) | (total == 3), total == 3)
+    kernel = neighbours.regular(ndim=2, r=1)
+    for chunk in [2**4, 2**16]:
+        built = rules.build(kernel, 2, life, chunk=chunk)
+        assert built.shape == (2,) * 9
+        assert np.all(built == rule.reshape([2] * 9))
+
+
+@mark.parametrize("nstates", [2, 3])
+def test_build_cells(nstates):
+    kernel = neighbours.hexagonal(ndim=2, r=1)
+    rule = initializers.random(states=nstates, size=[nstates] * 9)
+
+    class Automaton(BaseAutomaton):
+        neighbours = kernel
+        states = nstates
+
+    def lookup(x):  # Rule table entry of each decoded neighbourhood
+        assert np.all(x.counts.sum(axis=1) == np.count_nonzero(kernel) - 1)
+        return rule.ravel()[np.sum(x.cells * Automaton.weights(), (1, 2))]
+
+    built = rules.build(kernel, nstates, lookup, chunk=10)
+    reachable = rules.compile(kernel, nstates, rule).indexes
+    assert np.all(built.ravel()[reachable] == rule.ravel()[reachable])
+
+
+def test_build_cache(tmp_path):
+    kernel = neighbours.regular(ndim=2, r=1)
+    built = rules.build(kernel, 2, life, cache=tmp_path)
+    assert len(list(tmp_path.iterdir())) == 1
+    cached = rules.build(kernel, 2, life, cache=tmp_path)
+    assert isinstance(cached.base, np.memmap)
+    assert np.all(cached == built)
+    rules.build(kernel, 2, lambda x: x.sum == 3, cache=tmp_path)
+    rules.build(kernel, 2, lambda x: x.sum == 2, cache=tmp_path)
+    assert len(list(tmp_path.iterdir())) == 3
+
+
+def table_rule(table):
+    return lambda x: table[x.sum]
+
+
+def test_build_cache_closures(tmp_path):
+    kernel = neighbours.regular(ndim=1, r=1)
+    first, second = np.zeros(2000, "uint8"), np.zeros(2000, "uint8")
+    second[1] = 1  # Same truncated repr
+    rules.build(kernel, 2, table_rule(first), cache=tmp_path)
+    built = rules.build(kernel, 2, table_rule(second), cache=tmp_path)
+    assert built.any() and len(list(tmp_path.iterdir())) == 2
+    opaque = object()
+    with raises(ValueError):
+        rules.build(kernel, 2, lambda x: x.sum * 0 + (opaque is None),
+                    cache=tmp_path)
+    rules.build(kernel, 2, lambda x: x.sum * 0 + (opaque is None),
+                cache=tmp_path, key="opaque")
+    assert len(list(tmp_path.iterdir())) == 3
+
+
+def test_build_invalid():
+    kernel = neighbours.regular(ndim=1, r=1)
+    with raises(ValueError):
+        rules.build(kernel, 2, lambda x: x.sum)
+    with raises(ValueError):
+        rules.build(kernel, 2, lambda x: x.centre[:1])